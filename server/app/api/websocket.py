@@ -6,15 +6,17 @@ WebSocket API - open-xiaoai 客户端通信
 """
 
 import asyncio
+import itertools
 import logging
+import sys
 import time
 import uuid
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
-from ..config import get_settings
+from ..config import AudioConfig, get_settings
 from ..models.protocol import (
     Event, Stream, Request, Response,
     ListeningState, PlayingState,
@@ -22,13 +24,47 @@ from ..models.protocol import (
 )
 from ..core.asr import AudioBuffer
 from ..handlers import HandlerResponse
+from ..utils.audio import calculate_rms
+
+# asyncio.timeout 不像 wait_for 那样为每次等待额外创建 Task（3.11 以下用 async_timeout）
+if sys.version_info >= (3, 11):
+    from asyncio import timeout as _timeout
+else:
+    from async_timeout import timeout as _timeout
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# 录音完成待处理队列容量（pipeline 处理中又完成新录音时最多积压的段数，满则丢弃最早的）
+AUDIO_QUEUE_SIZE = 2
+
+# ASR final 合并窗口 (秒)：final 后稍等再处理，窗口内到达的修正 final 只覆盖文本，不重复触发 pipeline
+FINAL_COALESCE_WINDOW = 0.15
+
+# 设备 ID: 进程级随机前缀 + 自增序号（每次连接不再读 urandom；
+# 前缀避免重启后序号重复，撞上 Redis 中旧连接遗留的播放队列键）
+_DEVICE_ID_PREFIX = uuid.uuid4().hex[:8]
+_device_id_counter = itertools.count(1)
+
+
+def _new_device_id() -> str:
+    """生成设备连接 ID"""
+    return f"{_DEVICE_ID_PREFIX}-{next(_device_id_counter)}"
+
+
+# 接收二进制音频帧的监听状态（其余状态直接丢弃）
+# 模块级元组：免去每帧重建元组；Enum.__hash__ 是 Python 函数，小元组逐个比对身份比 frozenset 更快
+_AUDIO_STATES = (
+    ListeningState.WOKEN, ListeningState.LISTENING,
+    ListeningState.PROMPTING, ListeningState.WAITING_SPEECH,
+)
+
+# 音频路径激活（本地录音中/连续对话中）的状态，此时忽略 instruction 事件
+_AUDIO_PATH_STATES = _AUDIO_STATES + (ListeningState.PROCESSING,)
+
 
-@dataclass
+@dataclass(slots=True)
 class PendingAction:
     """待确认操作（多轮对话状态）"""
     action_type: str              # 操作类型，如 "delete_content"
@@ -41,7 +77,7 @@ class PendingAction:
         return (time.time() - self.created_at) > self.timeout
 
 
-@dataclass
+@dataclass(slots=True)
 class DeviceConnection:
     """设备连接状态"""
     device_id: str
@@ -59,13 +95,15 @@ class DeviceConnection:
     # 当前播放内容
     current_content: Optional[Dict] = None
 
-    # 超时任务
-    _timeout_task: Optional[asyncio.Task] = None
+    # 唤醒超时 / 提示音安全超时（loop.call_later 句柄，无需为单次超时创建 Task）
+    _timeout_handle: Optional[asyncio.TimerHandle] = None
 
     # 指令文本缓冲（open-xiaoai 流式 ASR 去抖）
     _instruction_text: Optional[str] = None
-    _instruction_timer: Optional[asyncio.Task] = None
+    _instruction_timer: Optional[asyncio.TimerHandle] = None
     _instruction_dispatched: bool = False  # 防止 is_stop + is_final 重复触发
+    _instruction_round: int = 0  # 指令轮次（较早轮次的处理 Task 结束时不再改写连接状态）
+    _final_coalesce_handle: Optional[asyncio.TimerHandle] = None  # final 合并窗口
 
     # start_recording 请求 ID（用于异步检测失败）
     _start_recording_id: Optional[str] = None
@@ -87,63 +125,107 @@ class DeviceConnection:
 
     # 连续对话会话状态
     _in_conversation_session: bool = False           # 是否在连续对话中
-    _waiting_speech_timeout_task: Optional[asyncio.Task] = None  # WAITING_SPEECH 超时
+    _waiting_speech_timeout_handle: Optional[asyncio.TimerHandle] = None  # WAITING_SPEECH 超时
+
+    # 诊断帧计数（PROMPTING 丢弃帧 / WAITING_SPEECH 收到帧）
+    _prompting_frame_count: int = 0
+    _ws_diag_count: int = 0
 
     # 待确认操作（多轮对话）
     pending_action: Optional[PendingAction] = None
 
+    # 录音完成 → pipeline 处理队列（接收循环只负责入队，单 worker 串行处理）
+    _audio_queue: asyncio.Queue = field(
+        default_factory=lambda: asyncio.Queue(maxsize=AUDIO_QUEUE_SIZE)
+    )
+    _pipeline_worker: Optional[asyncio.Task] = None
+
     # 待响应的请求
     pending_requests: Dict[str, asyncio.Future] = field(default_factory=dict)
 
+    # 音频配置快照（连接建立时注入，热路径不再调用 get_settings）
+    audio_cfg: Optional[AudioConfig] = None
+
     def __post_init__(self):
+        if self.audio_cfg is None:
+            self.audio_cfg = get_audio_config()
         if self.audio_buffer is None:
-            settings = get_settings()
-            self.audio_buffer = AudioBuffer(
-                sample_rate=settings.audio.sample_rate,
-                sample_width=settings.audio.sample_width,
-                channels=settings.audio.channels,
-                silence_threshold=settings.audio.silence_threshold,
-                max_duration=settings.audio.max_duration,
-                min_duration=settings.audio.min_duration,
-            )
+            self.audio_buffer = self.new_audio_buffer()
+
+    def cancel_pending(self, *names: str):
+        """取消并清空指定的 Task / TimerHandle 属性
+
+        cancel() 对已完成的 Task 和已触发的 TimerHandle 无副作用，无需逐个判断 done()。
+        """
+        for name in names:
+            pending = getattr(self, name)
+            if pending is not None:
+                pending.cancel()
+                setattr(self, name, None)
+
+    def new_audio_buffer(self) -> AudioBuffer:
+        """按连接的音频配置创建 AudioBuffer"""
+        cfg = self.audio_cfg
+        return AudioBuffer(
+            sample_rate=cfg.sample_rate,
+            sample_width=cfg.sample_width,
+            channels=cfg.channels,
+            silence_threshold=cfg.silence_threshold,
+            max_duration=cfg.max_duration,
+            min_duration=cfg.min_duration,
+        )
 
 
 class ConnectionManager:
     """WebSocket 连接管理器"""
 
     def __init__(self):
+        # 仅在事件循环线程内访问，dict 单步操作即原子，无需加锁
         self.connections: Dict[str, DeviceConnection] = {}
-        self._lock = asyncio.Lock()
 
     async def connect(self, websocket: WebSocket, device_id: str) -> DeviceConnection:
         """建立连接"""
         await websocket.accept()
 
-        async with self._lock:
-            if device_id in self.connections:
-                old_conn = self.connections[device_id]
-                try:
-                    await old_conn.websocket.close()
-                except Exception:
-                    pass
+        conn = DeviceConnection(
+            device_id=device_id, websocket=websocket, audio_cfg=get_audio_config(),
+        )
+        old_conn = self.connections.get(device_id)
+        self.connections[device_id] = conn
 
-            conn = DeviceConnection(device_id=device_id, websocket=websocket)
-            self.connections[device_id] = conn
+        # 旧连接在后台关闭，不阻塞新连接建立
+        if old_conn is not None:
+            asyncio.create_task(self._close_quietly(old_conn))
 
         logger.info(f"设备连接: {device_id}")
         return conn
 
-    async def disconnect(self, device_id: str):
-        """断开连接"""
-        async with self._lock:
-            if device_id in self.connections:
-                conn = self.connections.pop(device_id)
-                if conn._timeout_task and not conn._timeout_task.done():
-                    conn._timeout_task.cancel()
-                if conn._instruction_timer and not conn._instruction_timer.done():
-                    conn._instruction_timer.cancel()
-                if conn._waiting_speech_timeout_task and not conn._waiting_speech_timeout_task.done():
-                    conn._waiting_speech_timeout_task.cancel()
+    @staticmethod
+    async def _close_quietly(conn: DeviceConnection):
+        """关闭被替换的旧连接（忽略异常）"""
+        try:
+            await conn.websocket.close()
+        except Exception:
+            pass
+
+    async def disconnect(self, device_id: str, conn: Optional[DeviceConnection] = None):
+        """断开连接
+
+        Args:
+            device_id: 设备 ID
+            conn: 发起断开的连接；若该设备已被新连接替换，只清理 conn 自身，不移除新连接
+        """
+        if conn is None:
+            conn = self.connections.get(device_id)
+            if conn is None:
+                return
+        if self.connections.get(device_id) is conn:
+            del self.connections[device_id]
+
+        conn.cancel_pending(
+            "_timeout_handle", "_instruction_timer", "_final_coalesce_handle",
+            "_waiting_speech_timeout_handle", "_pipeline_worker",
+        )
 
         logger.info(f"设备断开: {device_id}")
 
@@ -156,40 +238,93 @@ class ConnectionManager:
         device_id: str,
         request: Request,
         wait_response: bool = False,
-        timeout: float = 10.0
+        timeout: float = 10.0,
+        conn: Optional[DeviceConnection] = None,
     ) -> Optional[Response]:
-        """发送请求到设备"""
-        conn = self.get_connection(device_id)
+        """发送请求到设备
+
+        Args:
+            conn: 调用方已持有的连接（事件处理路径），传入时跳过按 device_id 查找
+        """
+        if conn is None:
+            conn = self.get_connection(device_id)
         if not conn:
             logger.warning(f"设备未连接: {device_id}")
             return None
 
+        # 发送前登记 future：响应可能在 send_text 让出期间就被接收循环处理
+        future = None
+        if wait_response:
+            future = asyncio.get_running_loop().create_future()
+            conn.pending_requests[request.id] = future
+
         try:
             await conn.websocket.send_text(request.to_json())
-            payload_summary = str(request.payload)[:80] if request.payload else ""
-            logger.info(f"发送请求: {request.command}({payload_summary}) -> {device_id}")
-
-            if wait_response:
-                future = asyncio.get_event_loop().create_future()
-                conn.pending_requests[request.id] = future
+            if logger.isEnabledFor(logging.INFO):
+                payload_summary = str(request.payload)[:80] if request.payload else ""
+                logger.info(f"发送请求: {request.command}({payload_summary}) -> {device_id}")
 
-                try:
-                    response = await asyncio.wait_for(future, timeout=timeout)
-                    return response
-                except asyncio.TimeoutError:
-                    logger.warning(f"请求超时: {request.id}")
-                    return None
-                finally:
-                    conn.pending_requests.pop(request.id, None)
+            if future is None:
+                return None
+            try:
+                async with _timeout(timeout):
+                    return await future
+            except asyncio.TimeoutError:
+                logger.warning(f"请求超时: {request.id}")
+                return None
 
         except Exception as e:
             logger.error(f"发送请求失败: {e}")
             return None
+        finally:
+            # 正常路径由 handle_response 弹出 future，这里只清理超时/取消/发送失败的条目
+            if future is not None:
+                conn.pending_requests.pop(request.id, None)
+
+    async def send_requests(
+        self,
+        device_id: str,
+        requests: List[Request],
+        conn: Optional[DeviceConnection] = None,
+    ):
+        """按顺序连续发送多条请求（不等待响应）
+
+        只查找一次连接，先序列化全部请求再背靠背发送，
+        用于 abort_xiaoai + pause 这类需要尽快到达设备的成组命令。
+        """
+        if conn is None:
+            conn = self.get_connection(device_id)
+        if not conn:
+            logger.warning(f"设备未连接: {device_id}")
+            return
+
+        messages = [request.to_json() for request in requests]
+        send_text = conn.websocket.send_text
+        try:
+            for message in messages:
+                await send_text(message)
+        except Exception as e:
+            logger.error(f"发送请求失败: {e}")
+            return
+
+        if logger.isEnabledFor(logging.INFO):
+            summary = ", ".join(
+                f"{r.command}({str(r.payload)[:80] if r.payload else ''})" for r in requests
+            )
+            logger.info(f"发送请求: {summary} -> {device_id}")
 
     async def broadcast(self, request: Request):
-        """广播请求到所有设备"""
-        for device_id in list(self.connections.keys()):
-            await self.send_request(device_id, request)
+        """广播请求到所有设备（只序列化一次，并发发送）"""
+        message = request.to_json()
+        conns = list(self.connections.values())
+        results = await asyncio.gather(
+            *(conn.websocket.send_text(message) for conn in conns),
+            return_exceptions=True,
+        )
+        for conn, result in zip(conns, results):
+            if isinstance(result, Exception):
+                logger.warning(f"广播失败: {request.command} -> {conn.device_id}: {result}")
+        logger.info(f"广播请求: {request.command} -> {len(conns)} 台设备")
 
 
 # 全局连接管理器
@@ -199,6 +334,20 @@ manager = ConnectionManager()
 # 全局流水线实例 (在应用启动时初始化)
 _pipeline = None
 
+# 全局音频配置快照 (启动时由 set_pipeline 缓存)
+_audio_config: Optional[AudioConfig] = None
+
+# 提示音 URL 缓存 (MinIO 对象路径 → 公网 URL，启动时由 set_pipeline 预先生成)
+_prompt_url_cache: Dict[str, Optional[str]] = {}
+
+
+def get_audio_config() -> AudioConfig:
+    """获取音频配置快照"""
+    global _audio_config
+    if _audio_config is None:
+        _audio_config = get_settings().audio
+    return _audio_config
+
 
 def get_pipeline():
     """获取语音流水线实例"""
@@ -210,8 +359,13 @@ def get_pipeline():
 
 def set_pipeline(pipeline):
     """设置语音流水线实例"""
-    global _pipeline
+    global _pipeline, _audio_config
     _pipeline = pipeline
+    if pipeline is not None:
+        _audio_config = get_settings().audio
+        _prompt_url_cache.clear()
+        _get_prompt_sound_url(_audio_config.prompt_sound_path)
+        _get_prompt_sound_url(_audio_config.exit_sound_path)
 
 
 async def _auto_play_next(conn: DeviceConnection, pipeline):
@@ -239,7 +393,8 @@ async def _auto_play_next(conn: DeviceConnection, pipeline):
                     await pipeline.content_service.increment_play_count(content_id)
                     await manager.send_request(
                         conn.device_id,
-                        Request.play_url(content["play_url"])
+                        Request.play_url(content["play_url"]),
+                        conn=conn,
                     )
                     return
 
@@ -255,20 +410,24 @@ async def _auto_play_next(conn: DeviceConnection, pipeline):
 @router.websocket("/")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket 端点"""
-    device_id = str(uuid.uuid4())[:8]
+    device_id = _new_device_id()
 
     conn = await manager.connect(websocket, device_id)
 
+    receive = websocket.receive
     try:
         while True:
-            message = await websocket.receive()
+            message = await receive()
 
-            if message["type"] == "websocket.receive":
-                if "text" in message:
-                    await handle_text_message(conn, message["text"])
-                elif "bytes" in message:
-                    await handle_binary_message(conn, message["bytes"])
+            # 音频帧（二进制）是热路径，优先判断；只有它和文本帧会携带数据
+            data = message.get("bytes")
+            if data is not None:
+                await handle_binary_message(conn, data)
+                continue
 
+            text = message.get("text")
+            if text is not None:
+                await handle_text_message(conn, text)
             elif message["type"] == "websocket.disconnect":
                 break
 
@@ -277,7 +436,7 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         logger.error(f"WebSocket 错误: {e}", exc_info=True)
     finally:
-        await manager.disconnect(device_id)
+        await manager.disconnect(device_id, conn)
 
 
 async def handle_text_message(conn: DeviceConnection, text: str):
@@ -317,8 +476,9 @@ async def handle_event(conn: DeviceConnection, event: Event):
                     logger.debug(f"放行 handler 中间播放 (remaining={conn._handler_playback_count}, device={conn.device_id})")
                 else:
                     logger.info(f"拦截云端抢先播放 (pipeline 活跃中, device={conn.device_id})")
-                    await manager.send_request(conn.device_id, Request.abort_xiaoai())
-                    await manager.send_request(conn.device_id, Request.pause())
+                    await manager.send_requests(
+                        conn.device_id, [Request.abort_xiaoai(), Request.pause()], conn=conn
+                    )
 
             # 连续对话：提示音播完 → 进入 WAITING_SPEECH
             if state == PlayingState.IDLE and conn.state == ListeningState.PROMPTING:
@@ -339,19 +499,16 @@ async def handle_event(conn: DeviceConnection, event: Event):
 
             # 自动播放下一首：播放结束 + 队列活跃 + pipeline 空闲
             if state == PlayingState.IDLE and conn._queue_active and not conn._pipeline_active:
-                # 取消已有的待执行任务，防止重复触发
+                # 已有任务仍在 1.5s 防抖中：它醒来后会重新检查状态，无需重建
                 if conn._auto_play_task and not conn._auto_play_task.done():
-                    conn._auto_play_task.cancel()
+                    return
                 pipeline = get_pipeline()
                 if pipeline and pipeline.play_queue_service:
                     conn._auto_play_task = asyncio.create_task(_auto_play_next(conn, pipeline))
 
     elif event.is_instruction():
         # 如果音频路径已激活（本地录音中/连续对话中），忽略 instruction 事件
-        if conn.state in (
-            ListeningState.WOKEN, ListeningState.LISTENING, ListeningState.PROCESSING,
-            ListeningState.PROMPTING, ListeningState.WAITING_SPEECH,
-        ):
+        if conn.state in _AUDIO_PATH_STATES:
             logger.debug(
                 f"忽略 instruction 事件 (当前状态={conn.state.value}，音频路径激活)"
             )
@@ -360,47 +517,49 @@ async def handle_event(conn: DeviceConnection, event: Event):
         # 云端播放命令拦截：pipeline 处理中收到 AudioPlayer/Play 或 TTS → 立即打断
         if conn._pipeline_active and event.is_cloud_playback_command():
             logger.info(f"拦截云端播放命令 (pipeline 活跃中, device={conn.device_id})")
-            await manager.send_request(conn.device_id, Request.abort_xiaoai())
-            await manager.send_request(conn.device_id, Request.pause())
+            await manager.send_requests(
+                conn.device_id, [Request.abort_xiaoai(), Request.pause()], conn=conn
+            )
             return
 
         # 任何 instruction 活动（含 NewFile / 空 RecognizeResult）都应取消自动播放
         # 防止唤醒词后用户稍有停顿（>1.5s）时 auto_play 抢先推进队列
-        if conn._auto_play_task and not conn._auto_play_task.done():
-            conn._auto_play_task.cancel()
-            conn._auto_play_task = None
+        conn.cancel_pending("_auto_play_task")
 
         text = event.get_instruction_text()
         if text:
             is_final = event.is_instruction_final()
             logger.info(f"收到指令文本: '{text}' (final={is_final})")
+            if not is_final and conn._final_coalesce_handle is not None:
+                # 上一轮仍在 final 合并窗口中就开始了新一轮 ASR：立即按上一轮文本处理，
+                # 不让新一轮的文本覆盖它
+                _dispatch_instruction(conn)
             conn._instruction_text = text
 
             if is_final and not conn._instruction_dispatched:
-                # ASR 最终结果，立即中断小爱并处理（不等去抖）
+                # ASR 最终结果，立即中断小爱，短暂合并后处理（不等去抖）
                 conn._instruction_dispatched = True
-                if conn._instruction_timer and not conn._instruction_timer.done():
-                    conn._instruction_timer.cancel()
-                    conn._instruction_timer = None
+                conn._instruction_round += 1
+                conn.cancel_pending("_instruction_timer")
                 # 在 await 之前同步设置！防止 yield 期间 Idle 事件触发 _auto_play_next
-                if conn._auto_play_task and not conn._auto_play_task.done():
-                    conn._auto_play_task.cancel()
-                    conn._auto_play_task = None
+                conn.cancel_pending("_auto_play_task")
                 conn._pipeline_active = True
                 logger.info(f"ASR final，立即中断小爱并处理")
-                await manager.send_request(conn.device_id, Request.abort_xiaoai())
-                asyncio.create_task(_on_instruction_complete(conn))
-            elif not is_final:
+                await manager.send_request(conn.device_id, Request.abort_xiaoai(), conn=conn)
+                _arm_final_coalesce(conn)
+            elif is_final:
+                # 同一轮的修正 final：窗口未到期则只覆盖文本并重新计时；窗口已到期则丢弃
+                if conn._final_coalesce_handle is not None:
+                    _arm_final_coalesce(conn)
+            else:
                 # 收到新的非 final 事件 = 新一轮 ASR 开始，重置 dispatch 防护
                 # 这样新一轮的 final 事件能正常触发 dispatch
                 # 同一轮的重复 final 仍然被阻止（中间不会有非 final 事件）
                 conn._instruction_dispatched = False
                 # 用户开始说话，立即取消自动播放，防止队列指针在用户命令前被推进
                 # 场景：歌曲结束 → auto_play 1.5s 后推进队列 → 用户说"上一首" → 指针已偏移
-                if conn._auto_play_task and not conn._auto_play_task.done():
-                    conn._auto_play_task.cancel()
-                    conn._auto_play_task = None
-                await _reset_instruction_timer(conn)
+                conn.cancel_pending("_auto_play_task")
+                _reset_instruction_timer(conn)
 
 
 async def handle_response(conn: DeviceConnection, response: Response):
@@ -421,17 +580,15 @@ async def handle_response(conn: DeviceConnection, response: Response):
             # 回退状态：如果还在 WOKEN（尚未收到音频），重置为 IDLE
             if conn.state == ListeningState.WOKEN:
                 conn.state = ListeningState.IDLE
-                if conn._timeout_task and not conn._timeout_task.done():
-                    conn._timeout_task.cancel()
+                conn.cancel_pending("_timeout_handle")
             return
         else:
             logger.info(f"start_recording 确认成功 (device={conn.device_id})")
             return
 
-    if response.id in conn.pending_requests:
-        future = conn.pending_requests[response.id]
-        if not future.done():
-            future.set_result(response)
+    future = conn.pending_requests.pop(response.id, None)
+    if future is not None and not future.done():
+        future.set_result(response)
 
 
 async def handle_binary_message(conn: DeviceConnection, data: bytes):
@@ -443,10 +600,8 @@ async def handle_binary_message(conn: DeviceConnection, data: bytes):
 
     连续对话模式下，PROMPTING 时丢弃音频，WAITING_SPEECH 时检测持续语音。
     """
-    if conn.state not in (
-        ListeningState.WOKEN, ListeningState.LISTENING,
-        ListeningState.PROMPTING, ListeningState.WAITING_SPEECH,
-    ):
+    state = conn.state
+    if state not in _AUDIO_STATES:
         return
 
     # 尝试解析为 Stream 对象
@@ -461,103 +616,166 @@ async def handle_binary_message(conn: DeviceConnection, data: bytes):
         return
 
     # PROMPTING 状态：提示音播放中，丢弃音频（录音仍在运行但不处理）
-    if conn.state == ListeningState.PROMPTING:
-        if not hasattr(conn, '_prompting_frame_count'):
-            conn._prompting_frame_count = 0
+    if state == ListeningState.PROMPTING:
         conn._prompting_frame_count += 1
-        if conn._prompting_frame_count % 50 == 1:
+        if conn._prompting_frame_count % 50 == 1 and logger.isEnabledFor(logging.INFO):
             logger.info(f"[DIAG] PROMPTING 帧 #{conn._prompting_frame_count}: pcm_size={len(pcm_data)} (device={conn.device_id})")
         return
 
+    # 连接生命周期内复用同一个 AudioBuffer，取到局部变量避免逐帧重复属性查找
+    audio_buffer = conn.audio_buffer
+
     # WAITING_SPEECH 状态：检测持续语音，达标后进入 LISTENING
-    if conn.state == ListeningState.WAITING_SPEECH:
+    if state == ListeningState.WAITING_SPEECH:
         # 诊断日志：追踪帧到达情况
-        if not hasattr(conn, '_ws_diag_count'):
-            conn._ws_diag_count = 0
         conn._ws_diag_count += 1
-        if conn._ws_diag_count % 50 == 1:  # 每 ~1s 记录一次
-            import struct as _struct
-            try:
-                _samples = _struct.unpack(f"<{len(pcm_data) // 2}h", pcm_data)
-                _rms = (sum(s ** 2 for s in _samples) / len(_samples)) ** 0.5 if _samples else 0
-            except _struct.error:
-                _rms = -1
+        # 每 ~1s 记录一次；日志级别关闭时跳过 RMS 计算和字符串格式化
+        if conn._ws_diag_count % 50 == 1 and logger.isEnabledFor(logging.INFO):
             logger.info(
                 f"[DIAG] WAITING_SPEECH 帧 #{conn._ws_diag_count}: "
-                f"pcm_size={len(pcm_data)}, rms={_rms:.0f}, threshold={conn.audio_buffer.energy_threshold}, "
-                f"voice_active={conn.audio_buffer._consecutive_voice_active} "
+                f"pcm_size={len(pcm_data)}, rms={calculate_rms(pcm_data):.0f}, threshold={audio_buffer.energy_threshold}, "
+                f"voice_active={audio_buffer._consecutive_voice_active} "
                 f"(device={conn.device_id})"
             )
 
-        settings = get_settings()
-        if conn.audio_buffer.has_sustained_speech(pcm_data, settings.audio.min_speech_duration_ms):
+        if audio_buffer.has_sustained_speech(pcm_data, conn.audio_cfg.min_speech_duration_ms):
             logger.info(f"检测到持续语音 (帧 #{conn._ws_diag_count})，进入 LISTENING (device={conn.device_id})")
             conn._ws_diag_count = 0
             # 取消等待超时
-            if conn._waiting_speech_timeout_task and not conn._waiting_speech_timeout_task.done():
-                conn._waiting_speech_timeout_task.cancel()
-                conn._waiting_speech_timeout_task = None
+            conn.cancel_pending("_waiting_speech_timeout_handle")
             conn.state = ListeningState.LISTENING
-            # 重新初始化主录音 buffer（从用户开口处开始收集）
-            conn.audio_buffer = AudioBuffer(
-                sample_rate=settings.audio.sample_rate,
-                sample_width=settings.audio.sample_width,
-                channels=settings.audio.channels,
-                silence_threshold=settings.audio.silence_threshold,
-                max_duration=settings.audio.max_duration,
-                min_duration=settings.audio.min_duration,
-            )
-            conn.audio_buffer.start()
-            conn.audio_buffer.append(pcm_data)
+            # 复用同一 buffer 重新开始录音（start 重置全部状态，从用户开口处开始收集）
+            audio_buffer.start()
+            audio_buffer.append(pcm_data)
         return
 
-    if conn.state == ListeningState.WOKEN:
+    if state == ListeningState.WOKEN:
         conn.state = ListeningState.LISTENING
-        conn.audio_buffer.start()
+        audio_buffer.start()
         logger.info(f"开始录音: {conn.device_id}")
 
-        if conn._timeout_task and not conn._timeout_task.done():
-            conn._timeout_task.cancel()
+        conn.cancel_pending("_timeout_handle")
 
-    conn.audio_buffer.append(pcm_data)
+    audio_buffer.append(pcm_data)
 
-    if conn.audio_buffer.should_stop():
-        # 立即切换状态防止重复触发，然后在独立 task 中处理
+    if audio_buffer.should_stop():
+        # 立即切换状态防止重复触发，录音交给 pipeline worker 处理
         # （不阻塞 WebSocket 消息循环，使 _pipeline_active 拦截生效）
         conn.state = ListeningState.PROCESSING
-        asyncio.create_task(on_audio_complete(conn))
+        audio_data = audio_buffer.stop()
+        _enqueue_audio(conn, audio_data, audio_buffer.has_speech)
+
+
+def _enqueue_audio(conn: DeviceConnection, audio_data: bytes, has_speech: bool):
+    """录音入队，按需启动该连接的 pipeline worker
+
+    has_speech 为 False（语音帧不足）的录音由 pipeline 直接按"没听清"处理，不调用 ASR。
+    """
+    queue = conn._audio_queue
+    if queue.full():
+        queue.get_nowait()
+        logger.warning(f"录音处理积压，丢弃最早的一段 (device={conn.device_id})")
+    queue.put_nowait((audio_data, has_speech))
+
+    if conn._pipeline_worker is None or conn._pipeline_worker.done():
+        conn._pipeline_worker = asyncio.create_task(_pipeline_worker(conn))
+
+
+async def _pipeline_worker(conn: DeviceConnection):
+    """逐段处理录音（每个连接一个，随连接断开取消）"""
+    queue = conn._audio_queue
+    while True:
+        audio_data, has_speech = await queue.get()
+        try:
+            await on_audio_complete(conn, audio_data, has_speech)
+        except Exception as e:
+            logger.error(f"pipeline worker 异常: {e}", exc_info=True)
+
+
+async def _cancel_pipeline_worker(conn: DeviceConnection):
+    """取消 pipeline worker 并清空积压录音，等待其 finally 清理完成
+
+    需在会话标记清除之后调用，被取消的 on_audio_complete 才不会走连续对话/退出对话分支。
+    """
+    queue = conn._audio_queue
+    dropped = queue.qsize()
+    while not queue.empty():
+        queue.get_nowait()
+    if dropped:
+        logger.info(f"唤醒打断，丢弃 {dropped} 段待处理录音 (device={conn.device_id})")
+
+    worker = conn._pipeline_worker
+    conn.cancel_pending("_pipeline_worker")
+    if worker is not None:
+        try:
+            await worker
+        except asyncio.CancelledError:
+            pass
 
 
-async def _reset_instruction_timer(conn: DeviceConnection):
+def _reset_instruction_timer(conn: DeviceConnection):
     """重置指令去抖定时器
 
     open-xiaoai 的 instruction 是流式的（多个 NewLine 事件），
     每次收到新文本时重置定时器。1.5 秒无新文本则视为最终结果。
+    重置只是换一个 call_later 句柄，到期后才创建处理 Task。
     """
-    if conn._instruction_timer and not conn._instruction_timer.done():
-        conn._instruction_timer.cancel()
+    conn.cancel_pending("_instruction_timer")
+    conn._instruction_timer = asyncio.get_running_loop().call_later(
+        1.5, _on_instruction_timeout, conn,
+    )
 
-    async def _fire():
-        await asyncio.sleep(1.5)
-        # Guard: 如果已被 is_final 路径触发，跳过（防止重复 dispatch）
-        if conn._instruction_dispatched:
-            return
-        conn._instruction_dispatched = True
-        await _on_instruction_complete(conn)
 
-    conn._instruction_timer = asyncio.create_task(_fire())
+def _arm_final_coalesce(conn: DeviceConnection):
+    """（重新）启动 final 合并窗口，连接上始终只保留一个句柄"""
+    conn.cancel_pending("_final_coalesce_handle")
+    conn._final_coalesce_handle = asyncio.get_running_loop().call_later(
+        FINAL_COALESCE_WINDOW, _on_final_coalesced, conn,
+    )
+
 
+def _on_final_coalesced(conn: DeviceConnection):
+    """final 合并窗口到期回调：按窗口内最新的文本处理"""
+    conn._final_coalesce_handle = None
+    _dispatch_instruction(conn)
 
-async def _on_instruction_complete(conn: DeviceConnection):
-    """指令去抖完成，处理最终文本"""
+
+def _on_instruction_timeout(conn: DeviceConnection):
+    """指令去抖到期回调"""
+    conn._instruction_timer = None
+    # Guard: 如果已被 is_final 路径触发，跳过（防止重复 dispatch）
+    if conn._instruction_dispatched:
+        return
+    conn._instruction_dispatched = True
+    conn._instruction_round += 1
+    _dispatch_instruction(conn)
+
+
+def _dispatch_instruction(conn: DeviceConnection):
+    """取走当前轮的指令文本并创建处理 Task
+
+    文本在此刻捕获，之后到达的新一轮 ASR 事件不会再覆盖它。
+    """
+    conn.cancel_pending("_final_coalesce_handle")
     text = conn._instruction_text
     conn._instruction_text = None
-    conn._instruction_timer = None
+    asyncio.create_task(_on_instruction_complete(conn, text, conn._instruction_round))
+
+
+async def _on_instruction_complete(conn: DeviceConnection, text: Optional[str], round_id: int):
+    """指令去抖完成，处理最终文本
+
+    Args:
+        conn: 设备连接
+        text: 本轮最终文本
+        round_id: 本轮轮次；处理结束时若已有更新的轮次，连接状态交给新一轮维护
+    """
     # 注意: 不重置 _instruction_dispatched — 保持 True 防止同一轮 final 事件重复触发
-    # 在下一轮 ASR 的 non-final 事件中重置（见 handle_event elif not is_final 分支）
+    # 在下一轮 ASR 的 non-final 事件中重置（见 handle_event 非 final 分支）
 
     if not text or not text.strip():
-        conn._pipeline_active = False  # 重置（final 路径提前设置了 True）
+        if round_id == conn._instruction_round:
+            conn._pipeline_active = False  # 重置（final 路径提前设置了 True）
         return
 
     logger.info(f"指令最终文本: '{text}' (device={conn.device_id})")
@@ -565,14 +783,13 @@ async def _on_instruction_complete(conn: DeviceConnection):
     # 立即标记 pipeline 活跃 + 取消自动播放（在任何 await 之前！）
     # 防止 await 期间 Idle 事件触发 _auto_play_next 与用户命令竞态
     conn._pipeline_active = True
-    if conn._auto_play_task and not conn._auto_play_task.done():
-        conn._auto_play_task.cancel()
-        conn._auto_play_task = None
+    conn.cancel_pending("_auto_play_task")
 
     # 中断小爱原生响应 + 暂停音乐播放器
     try:
-        await manager.send_request(conn.device_id, Request.abort_xiaoai())
-        await manager.send_request(conn.device_id, Request.pause())
+        await manager.send_requests(
+            conn.device_id, [Request.abort_xiaoai(), Request.pause()], conn=conn
+        )
         logger.info(f"已中断小爱原生响应并暂停播放 (device={conn.device_id})")
     except Exception as e:
         logger.warning(f"中断小爱失败: {e}")
@@ -586,17 +803,23 @@ async def _on_instruction_complete(conn: DeviceConnection):
         try:
             await manager.send_request(
                 conn.device_id,
-                Request.play_text("抱歉，出了点问题")
+                Request.play_text("抱歉，出了点问题"),
+                conn=conn,
             )
         except Exception:
             pass
     finally:
-        conn._pipeline_active = False
-        conn._handler_playback_count = 0
-
+        superseded = round_id != conn._instruction_round
+        if not superseded:
+            conn._pipeline_active = False
+            conn._handler_playback_count = 0
+
+        if superseded:
+            # 处理期间已开始新一轮指令：_pipeline_active 与状态由新一轮负责
+            logger.info(f"跳过状态更新: 已有新一轮指令 (device={conn.device_id})")
         # 安全检查：如果 pipeline 处理期间唤醒词到达，状态已被改为 WOKEN/LISTENING，
         # 不应覆盖，直接放弃连续对话逻辑
-        if conn.state in (ListeningState.WOKEN, ListeningState.LISTENING):
+        elif conn.state in (ListeningState.WOKEN, ListeningState.LISTENING):
             logger.info(f"跳过连续对话逻辑: 唤醒词已介入 (state={conn.state.value}, device={conn.device_id})")
             conn._continue_listening_pending = False
         elif conn._continue_listening_pending:
@@ -609,15 +832,15 @@ async def _on_instruction_complete(conn: DeviceConnection):
                     conn._in_conversation_session = True
                     # _continue_listening_pending 保持 True（不清除）
                     # instruction 路径没有活跃录音，需要启动
-                    settings = get_settings()
+                    cfg = conn.audio_cfg
                     start_rec_req = Request.start_recording(
                         pcm="noop",
-                        sample_rate=settings.audio.sample_rate,
-                        channels=settings.audio.channels,
-                        bits_per_sample=settings.audio.sample_width * 8,
+                        sample_rate=cfg.sample_rate,
+                        channels=cfg.channels,
+                        bits_per_sample=cfg.sample_width * 8,
                     )
                     conn._start_recording_id = start_rec_req.id
-                    await manager.send_request(conn.device_id, start_rec_req)
+                    await manager.send_request(conn.device_id, start_rec_req, conn=conn)
                 except Exception as e:
                     logger.error(f"连续对话启动录音失败: {e}", exc_info=True)
                     conn.state = ListeningState.IDLE
@@ -646,47 +869,35 @@ async def _start_listening_session_initial(conn: DeviceConnection):
     4. 启动唤醒超时定时器
     """
     # 1. 中断小米云端
-    await manager.send_request(conn.device_id, Request.abort_xiaoai())
+    await manager.send_request(conn.device_id, Request.abort_xiaoai(), conn=conn)
 
     # 2. 启动共享录音 (pcm="noop" dsnoop 设备)
-    settings = get_settings()
+    cfg = conn.audio_cfg
     start_rec_req = Request.start_recording(
         pcm="noop",
-        sample_rate=settings.audio.sample_rate,
-        channels=settings.audio.channels,
-        bits_per_sample=settings.audio.sample_width * 8,
+        sample_rate=cfg.sample_rate,
+        channels=cfg.channels,
+        bits_per_sample=cfg.sample_width * 8,
     )
     conn._start_recording_id = start_rec_req.id
-    await manager.send_request(conn.device_id, start_rec_req)
+    await manager.send_request(conn.device_id, start_rec_req, conn=conn)
 
     # 3. 乐观设置状态 + 初始化音频缓冲
     conn.state = ListeningState.WOKEN
 
-    # 取消任何待处理的 instruction 定时器
-    if conn._instruction_timer and not conn._instruction_timer.done():
-        conn._instruction_timer.cancel()
-        conn._instruction_timer = None
+    # 取消任何待处理的 instruction 定时器；合并窗口中的 final 不再处理，撤销其 _pipeline_active
+    if conn._final_coalesce_handle is not None:
+        conn._pipeline_active = False
+    conn.cancel_pending("_instruction_timer", "_final_coalesce_handle")
     conn._instruction_text = None
     conn._instruction_dispatched = False
 
-    conn.audio_buffer = AudioBuffer(
-        sample_rate=settings.audio.sample_rate,
-        sample_width=settings.audio.sample_width,
-        channels=settings.audio.channels,
-        silence_threshold=settings.audio.silence_threshold,
-        max_duration=settings.audio.max_duration,
-        min_duration=settings.audio.min_duration,
-    )
+    conn.audio_buffer.reset()
 
     # 4. 唤醒超时
-    async def wake_timeout():
-        await asyncio.sleep(settings.audio.wake_timeout)
-        if conn.state == ListeningState.WOKEN:
-            logger.info(f"唤醒超时，停止录音: {conn.device_id}")
-            await manager.send_request(conn.device_id, Request.stop_recording())
-            conn.state = ListeningState.IDLE
-
-    conn._timeout_task = asyncio.create_task(wake_timeout())
+    conn._timeout_handle = asyncio.get_running_loop().call_later(
+        cfg.wake_timeout, _on_wake_timeout, conn,
+    )
     logger.info(f"监听会话已启动 (device={conn.device_id})")
 
 
@@ -703,10 +914,9 @@ async def _continue_listening_session(conn: DeviceConnection):
     conn.state = ListeningState.PROMPTING
 
     # 播放 "叮~" 提示音
-    settings = get_settings()
-    prompt_url = _get_prompt_sound_url(settings.audio.prompt_sound_path)
+    prompt_url = _get_prompt_sound_url(conn.audio_cfg.prompt_sound_path)
     if prompt_url:
-        await manager.send_request(conn.device_id, Request.play_url(prompt_url))
+        await manager.send_request(conn.device_id, Request.play_url(prompt_url), conn=conn)
         logger.info(f"连续对话: 播放提示音 (device={conn.device_id})")
     else:
         # 提示音 URL 不可用，直接进入 WAITING_SPEECH
@@ -715,58 +925,61 @@ async def _continue_listening_session(conn: DeviceConnection):
         return
 
     # 安全超时：3 秒后如果 playing_state IDLE 事件没来（提示音播放失败），强制进入
-    async def _prompting_safety_timeout():
-        await asyncio.sleep(3.0)
-        if conn.state == ListeningState.PROMPTING:
-            logger.warning(f"提示音安全超时，强制进入 WAITING_SPEECH (device={conn.device_id})")
-            await _enter_waiting_speech(conn)
+    conn._timeout_handle = asyncio.get_running_loop().call_later(
+        3.0, _on_prompting_timeout, conn,
+    )
 
-    conn._timeout_task = asyncio.create_task(_prompting_safety_timeout())
+
+def _on_wake_timeout(conn: DeviceConnection):
+    """唤醒超时回调：仍在 WOKEN（未收到音频）→ 停止录音并回到 IDLE"""
+    conn._timeout_handle = None
+    if conn.state == ListeningState.WOKEN:
+        logger.info(f"唤醒超时，停止录音: {conn.device_id}")
+        conn.state = ListeningState.IDLE
+        asyncio.create_task(manager.send_request(conn.device_id, Request.stop_recording(), conn=conn))
+
+
+def _on_prompting_timeout(conn: DeviceConnection):
+    """提示音安全超时回调：仍在 PROMPTING → 强制进入 WAITING_SPEECH"""
+    conn._timeout_handle = None
+    if conn.state == ListeningState.PROMPTING:
+        logger.warning(f"提示音安全超时，强制进入 WAITING_SPEECH (device={conn.device_id})")
+        asyncio.create_task(_enter_waiting_speech(conn))
 
 
 async def _enter_waiting_speech(conn: DeviceConnection):
     """进入 WAITING_SPEECH 状态（等待用户开口）
 
-    初始化语音检测用 AudioBuffer 和 15s 超时任务。
+    初始化语音检测用 AudioBuffer 和 15s 超时定时器。
     """
     # 取消安全超时
-    if conn._timeout_task and not conn._timeout_task.done():
-        conn._timeout_task.cancel()
-        conn._timeout_task = None
+    conn.cancel_pending("_timeout_handle")
 
     conn.state = ListeningState.WAITING_SPEECH
     conn._ws_diag_count = 0  # 重置诊断计数器
     conn._prompting_frame_count = 0
 
-    # 初始化用于语音检测的 AudioBuffer（reset 持续语音检测状态）
-    settings = get_settings()
-    conn.audio_buffer = AudioBuffer(
-        sample_rate=settings.audio.sample_rate,
-        sample_width=settings.audio.sample_width,
-        channels=settings.audio.channels,
-        silence_threshold=settings.audio.silence_threshold,
-        max_duration=settings.audio.max_duration,
-        min_duration=settings.audio.min_duration,
+    # 复用 AudioBuffer 做语音检测（reset 录音与持续语音检测状态）
+    conn.audio_buffer.reset()
+
+    # 15s 超时：无语音 → 退出对话（取消已有的等待超时）
+    conn.cancel_pending("_waiting_speech_timeout_handle")
+    conn._waiting_speech_timeout_handle = asyncio.get_running_loop().call_later(
+        conn.audio_cfg.continue_speech_timeout, _on_speech_timeout, conn,
     )
-    conn.audio_buffer.reset_sustained_speech()
 
-    # 15s 超时：无语音 → 退出对话
-    async def _speech_timeout():
-        await asyncio.sleep(settings.audio.continue_speech_timeout)
-        if conn.state == ListeningState.WAITING_SPEECH:
-            diag_count = getattr(conn, '_ws_diag_count', 0)
-            logger.info(
-                f"WAITING_SPEECH 超时 ({settings.audio.continue_speech_timeout}s)，"
-                f"共收到 {diag_count} 帧音频，退出对话 (device={conn.device_id})"
-            )
-            await _exit_conversation(conn)
+    logger.info(f"进入 WAITING_SPEECH (device={conn.device_id})")
 
-    # 取消已有的等待超时
-    if conn._waiting_speech_timeout_task and not conn._waiting_speech_timeout_task.done():
-        conn._waiting_speech_timeout_task.cancel()
-    conn._waiting_speech_timeout_task = asyncio.create_task(_speech_timeout())
 
-    logger.info(f"进入 WAITING_SPEECH (device={conn.device_id})")
+def _on_speech_timeout(conn: DeviceConnection):
+    """WAITING_SPEECH 超时回调：仍未开口 → 退出对话"""
+    conn._waiting_speech_timeout_handle = None
+    if conn.state == ListeningState.WAITING_SPEECH:
+        logger.info(
+            f"WAITING_SPEECH 超时 ({conn.audio_cfg.continue_speech_timeout}s)，"
+            f"共收到 {conn._ws_diag_count} 帧音频，退出对话 (device={conn.device_id})"
+        )
+        asyncio.create_task(_exit_conversation(conn))
 
 
 async def _exit_conversation(conn: DeviceConnection):
@@ -776,21 +989,15 @@ async def _exit_conversation(conn: DeviceConnection):
     logger.info(f"退出连续对话 (device={conn.device_id})")
 
     # 清理超时任务
-    if conn._waiting_speech_timeout_task and not conn._waiting_speech_timeout_task.done():
-        conn._waiting_speech_timeout_task.cancel()
-        conn._waiting_speech_timeout_task = None
-    if conn._timeout_task and not conn._timeout_task.done():
-        conn._timeout_task.cancel()
-        conn._timeout_task = None
+    conn.cancel_pending("_waiting_speech_timeout_handle", "_timeout_handle")
 
     # 播放退出音 "嘟~"
-    settings = get_settings()
-    exit_url = _get_prompt_sound_url(settings.audio.exit_sound_path)
+    exit_url = _get_prompt_sound_url(conn.audio_cfg.exit_sound_path)
     if exit_url:
-        await manager.send_request(conn.device_id, Request.play_url(exit_url))
+        await manager.send_request(conn.device_id, Request.play_url(exit_url), conn=conn)
 
     # 停止录音
-    await manager.send_request(conn.device_id, Request.stop_recording())
+    await manager.send_request(conn.device_id, Request.stop_recording(), conn=conn)
 
     # 重置状态
     conn.state = ListeningState.IDLE
@@ -801,12 +1008,16 @@ async def _exit_conversation(conn: DeviceConnection):
 
 
 def _get_prompt_sound_url(minio_path: str) -> Optional[str]:
-    """根据 MinIO 对象路径生成公网 URL"""
+    """根据 MinIO 对象路径生成公网 URL（配置启动后不变，结果缓存）"""
+    if minio_path in _prompt_url_cache:
+        return _prompt_url_cache[minio_path]
     settings = get_settings()
-    if not settings.minio.public_base_url:
-        return None
-    base = settings.minio.public_base_url.rstrip("/")
-    return f"{base}/{minio_path}"
+    url = None
+    if settings.minio.public_base_url:
+        base = settings.minio.public_base_url.rstrip("/")
+        url = f"{base}/{minio_path}"
+    _prompt_url_cache[minio_path] = url
+    return url
 
 
 async def on_wake_word(conn: DeviceConnection, event: Event):
@@ -815,51 +1026,45 @@ async def on_wake_word(conn: DeviceConnection, event: Event):
 
     # 停止自动播放队列 + 取消待执行的自动播放任务（消除竞态窗口）
     conn._queue_active = False
-    if conn._auto_play_task and not conn._auto_play_task.done():
-        conn._auto_play_task.cancel()
-        conn._auto_play_task = None
+    conn.cancel_pending("_auto_play_task")
 
     # 取消现有超时任务（防止 PROMPTING 安全超时等孤儿任务）
-    if conn._timeout_task and not conn._timeout_task.done():
-        conn._timeout_task.cancel()
-        conn._timeout_task = None
+    conn.cancel_pending("_timeout_handle")
 
     # 如果在连续对话中，先清理会话状态 + stop_recording
     if conn._in_conversation_session:
         logger.info(f"唤醒中断连续对话 (device={conn.device_id})")
-        if conn._waiting_speech_timeout_task and not conn._waiting_speech_timeout_task.done():
-            conn._waiting_speech_timeout_task.cancel()
-            conn._waiting_speech_timeout_task = None
+        conn.cancel_pending("_waiting_speech_timeout_handle")
         conn._in_conversation_session = False
         conn._continue_listening_pending = False
-        await manager.send_request(conn.device_id, Request.stop_recording())
+        await manager.send_request(conn.device_id, Request.stop_recording(), conn=conn)
+
+    # 打断正在处理的录音（respond 可能还在播放/等待），新录音不必排在旧回复之后
+    await _cancel_pipeline_worker(conn)
 
     await _start_listening_session_initial(conn)
 
 
-async def on_audio_complete(conn: DeviceConnection):
-    """处理录音完成（在独立 task 中运行，不阻塞 WebSocket 消息循环）"""
+async def on_audio_complete(conn: DeviceConnection, audio_data: bytes, has_speech: bool):
+    """处理录音完成（在 pipeline worker 中运行，不阻塞 WebSocket 消息循环）"""
     logger.info(f"录音完成: {conn.device_id}")
 
     in_session = conn._in_conversation_session
 
     if not in_session:
         # 首次唤醒路径：停止录音 + 中断小爱
-        await manager.send_request(conn.device_id, Request.stop_recording())
+        await manager.send_request(conn.device_id, Request.stop_recording(), conn=conn)
     # 连续对话路径：不停止录音，不调 abort_xiaoai
 
-    audio_data = conn.audio_buffer.stop()
-    # 注意: conn.state 已在 handle_binary_message 中设为 PROCESSING
+    # 注意: 录音数据已在 handle_binary_message 中取出，conn.state 已设为 PROCESSING
 
     # 取消待执行的自动播放任务（防止与用户命令竞态导致队列双重推进）
-    if conn._auto_play_task and not conn._auto_play_task.done():
-        conn._auto_play_task.cancel()
-        conn._auto_play_task = None
+    conn.cancel_pending("_auto_play_task")
 
     if not in_session:
         # 中断小爱原生响应（提前发送，ASR+NLU+Handler 期间完成 restart）
         try:
-            await manager.send_request(conn.device_id, Request.abort_xiaoai())
+            await manager.send_request(conn.device_id, Request.abort_xiaoai(), conn=conn)
         except Exception as e:
             logger.warning(f"中断小爱失败: {e}")
 
@@ -867,7 +1072,7 @@ async def on_audio_complete(conn: DeviceConnection):
     conn._pipeline_active = True
     try:
         pipeline = get_pipeline()
-        response = await pipeline.process_audio(audio_data, conn.device_id, conn)
+        response = await pipeline.process_audio(audio_data, conn.device_id, conn, has_speech)
 
         if response:
             conn.state = ListeningState.RESPONDING
@@ -879,7 +1084,8 @@ async def on_audio_complete(conn: DeviceConnection):
         try:
             await manager.send_request(
                 conn.device_id,
-                Request.play_text("抱歉，出了点问题")
+                Request.play_text("抱歉，出了点问题"),
+                conn=conn,
             )
         except Exception:
             pass
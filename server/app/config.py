@@ -10,11 +10,13 @@ import os
 from functools import lru_cache
 from dotenv import load_dotenv
 
-# 自动加载 .env 文件
-load_dotenv()
 
+def _b(value: str) -> bool:
+    """环境变量布尔值: 仅 "true"（不区分大小写）为真"""
+    return value.lower() == "true"
 
-@dataclass
+
+@dataclass(slots=True)
 class ServerConfig:
     """服务器配置"""
     host: str = "0.0.0.0"
@@ -23,7 +25,7 @@ class ServerConfig:
     debug: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class ASRConfig:
     """ASR 语音识别配置 (ai-manager STT API)"""
     # ai-manager STT 服务 (独立端口 10000，区别于 TTS/LLM 的 8000)
@@ -40,7 +42,7 @@ class ASRConfig:
     timeout: int = 30
 
 
-@dataclass
+@dataclass(slots=True)
 class TTSConfig:
     """TTS 语音合成配置 (支持多后端)"""
     # 后端选择: "ai-manager" | "edge-tts"
@@ -69,7 +71,7 @@ class TTSConfig:
     edge_cache_dir: str = "/tmp/voicegrow_tts_tmp"
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMConfig:
     """LLM 对话配置 (ai-manager API)"""
     # ai-manager 服务配置
@@ -97,7 +99,7 @@ class LLMConfig:
 6. 鼓励好奇心和学习，多用"你真棒"、"好问题"等鼓励语"""
 
 
-@dataclass
+@dataclass(slots=True)
 class DatabaseConfig:
     """MySQL 数据库配置"""
     host: str = "localhost"
@@ -114,7 +116,7 @@ class DatabaseConfig:
         return f"mysql+aiomysql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
 
 
-@dataclass
+@dataclass(slots=True)
 class MinIOConfig:
     """MinIO 对象存储配置"""
     endpoint: str = "localhost:9000"
@@ -131,7 +133,7 @@ class MinIOConfig:
     public_base_url: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class RedisConfig:
     """Redis 缓存配置"""
     host: str = "localhost"
@@ -161,7 +163,7 @@ class RedisConfig:
         return f"redis://{self.host}:{self.port}/{self.db}"
 
 
-@dataclass
+@dataclass(slots=True)
 class AudioConfig:
     """音频处理配置"""
     sample_rate: int = 16000        # 采样率 (Hz)
@@ -183,7 +185,79 @@ class AudioConfig:
     exit_sound_path: str = "system/prompt_exit.mp3"     # "嘟~" 退出音 MinIO 路径
 
 
-@dataclass
+# 环境变量映射: (配置段, 配置类, ((字段名, 环境变量名, 类型转换), ...))
+# 未设置的环境变量沿用 dataclass 默认值
+_ENV_TABLE = (
+    ("server", ServerConfig, (
+        ("host", "SERVER_HOST", str),
+        ("websocket_port", "WEBSOCKET_PORT", int),
+        ("http_port", "HTTP_PORT", int),
+        ("debug", "DEBUG", _b),
+    )),
+    ("asr", ASRConfig, (
+        ("base_url", "ASR_BASE_URL", str),
+        ("api_key", "ASR_API_KEY", str),
+        ("secret_key", "ASR_SECRET_KEY", str),
+        ("language", "ASR_LANGUAGE", str),
+        ("beam_size", "ASR_BEAM_SIZE", int),
+        ("vad_filter", "ASR_VAD_FILTER", _b),
+        ("timeout", "ASR_TIMEOUT", int),
+    )),
+    ("tts", TTSConfig, (
+        ("backend", "TTS_BACKEND", str),
+        ("base_url", "TTS_BASE_URL", str),
+        ("api_key", "TTS_API_KEY", str),
+        ("secret_key", "TTS_SECRET_KEY", str),
+        ("voice_zh", "TTS_VOICE_ZH", str),
+        ("voice_en", "TTS_VOICE_EN", str),
+        ("speaking_rate", "TTS_SPEAKING_RATE", float),
+        ("pitch", "TTS_PITCH", float),
+        ("timeout", "TTS_TIMEOUT", int),
+        ("edge_voice_zh", "TTS_EDGE_VOICE_ZH", str),
+        ("edge_voice_en", "TTS_EDGE_VOICE_EN", str),
+        ("edge_cache_dir", "TTS_EDGE_CACHE_DIR", str),
+    )),
+    ("llm", LLMConfig, (
+        ("base_url", "LLM_BASE_URL", str),
+        ("api_key", "LLM_API_KEY", str),
+        ("secret_key", "LLM_SECRET_KEY", str),
+        ("model_preference", "LLM_MODEL", str),
+        ("max_tokens", "LLM_MAX_TOKENS", int),
+        ("temperature", "LLM_TEMPERATURE", float),
+        ("timeout", "LLM_TIMEOUT", int),
+    )),
+    ("database", DatabaseConfig, (
+        ("host", "MYSQL_HOST", str),
+        ("port", "MYSQL_PORT", int),
+        ("user", "MYSQL_USER", str),
+        ("password", "MYSQL_PASSWORD", str),
+        ("database", "MYSQL_DATABASE", str),
+    )),
+    ("minio", MinIOConfig, (
+        ("endpoint", "MINIO_ENDPOINT", str),
+        ("access_key", "MINIO_ACCESS_KEY", str),
+        ("secret_key", "MINIO_SECRET_KEY", str),
+        ("bucket", "MINIO_BUCKET", str),
+        ("secure", "MINIO_SECURE", _b),
+        ("public_base_url", "MINIO_PUBLIC_BASE_URL", str),
+    )),
+    ("redis", RedisConfig, (
+        ("host", "REDIS_HOST", str),
+        ("port", "REDIS_PORT", int),
+        ("password", "REDIS_PASSWORD", str),
+        ("db", "REDIS_DB", int),
+        ("max_connections", "REDIS_MAX_CONNECTIONS", int),
+    )),
+    ("audio", AudioConfig, (
+        ("sample_rate", "AUDIO_SAMPLE_RATE", int),
+        ("silence_threshold", "AUDIO_SILENCE_THRESHOLD", float),
+        ("max_duration", "AUDIO_MAX_DURATION", float),
+        ("wake_timeout", "AUDIO_WAKE_TIMEOUT", float),
+    )),
+)
+
+
+@dataclass(slots=True)
 class Settings:
     """全局配置"""
     server: ServerConfig = field(default_factory=ServerConfig)
@@ -198,77 +272,17 @@ class Settings:
     @classmethod
     def from_env(cls) -> "Settings":
         """从环境变量加载配置"""
-        return cls(
-            server=ServerConfig(
-                host=os.getenv("SERVER_HOST", "0.0.0.0"),
-                websocket_port=int(os.getenv("WEBSOCKET_PORT", "4399")),
-                http_port=int(os.getenv("HTTP_PORT", "8000")),
-                debug=os.getenv("DEBUG", "false").lower() == "true",
-            ),
-            asr=ASRConfig(
-                base_url=os.getenv("ASR_BASE_URL", "http://ai-manager:10000"),
-                api_key=os.getenv("ASR_API_KEY", ""),
-                secret_key=os.getenv("ASR_SECRET_KEY", ""),
-                language=os.getenv("ASR_LANGUAGE", "zh"),
-                beam_size=int(os.getenv("ASR_BEAM_SIZE", "5")),
-                vad_filter=os.getenv("ASR_VAD_FILTER", "true").lower() == "true",
-                timeout=int(os.getenv("ASR_TIMEOUT", "30")),
-            ),
-            tts=TTSConfig(
-                backend=os.getenv("TTS_BACKEND", "ai-manager"),
-                base_url=os.getenv("TTS_BASE_URL", "http://ai-manager:8000"),
-                api_key=os.getenv("TTS_API_KEY", ""),
-                secret_key=os.getenv("TTS_SECRET_KEY", ""),
-                voice_zh=os.getenv("TTS_VOICE_ZH", "cmn-CN-Wavenet-C"),
-                voice_en=os.getenv("TTS_VOICE_EN", "en-US-Wavenet-C"),
-                speaking_rate=float(os.getenv("TTS_SPEAKING_RATE", "0.9")),
-                pitch=float(os.getenv("TTS_PITCH", "0.0")),
-                timeout=int(os.getenv("TTS_TIMEOUT", "30")),
-                edge_voice_zh=os.getenv("TTS_EDGE_VOICE_ZH", "zh-CN-XiaoxiaoNeural"),
-                edge_voice_en=os.getenv("TTS_EDGE_VOICE_EN", "en-US-JennyNeural"),
-                edge_cache_dir=os.getenv("TTS_EDGE_CACHE_DIR", "/tmp/voicegrow_tts_tmp"),
-            ),
-            llm=LLMConfig(
-                base_url=os.getenv("LLM_BASE_URL", "http://ai-manager:8000"),
-                api_key=os.getenv("LLM_API_KEY", ""),
-                secret_key=os.getenv("LLM_SECRET_KEY", ""),
-                model_preference=os.getenv("LLM_MODEL", "gemini-2.0-flash"),
-                max_tokens=int(os.getenv("LLM_MAX_TOKENS", "300")),
-                temperature=float(os.getenv("LLM_TEMPERATURE", "0.7")),
-                timeout=int(os.getenv("LLM_TIMEOUT", "30")),
-            ),
-            database=DatabaseConfig(
-                host=os.getenv("MYSQL_HOST", "localhost"),
-                port=int(os.getenv("MYSQL_PORT", "3306")),
-                user=os.getenv("MYSQL_USER", "voicegrow"),
-                password=os.getenv("MYSQL_PASSWORD", ""),
-                database=os.getenv("MYSQL_DATABASE", "voicegrow"),
-            ),
-            minio=MinIOConfig(
-                endpoint=os.getenv("MINIO_ENDPOINT", "localhost:9000"),
-                access_key=os.getenv("MINIO_ACCESS_KEY", ""),
-                secret_key=os.getenv("MINIO_SECRET_KEY", ""),
-                bucket=os.getenv("MINIO_BUCKET", "voicegrow"),
-                secure=os.getenv("MINIO_SECURE", "false").lower() == "true",
-                public_base_url=os.getenv("MINIO_PUBLIC_BASE_URL", ""),
-            ),
-            redis=RedisConfig(
-                host=os.getenv("REDIS_HOST", "localhost"),
-                port=int(os.getenv("REDIS_PORT", "6379")),
-                password=os.getenv("REDIS_PASSWORD"),
-                db=int(os.getenv("REDIS_DB", "0")),
-                max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", "50")),
-            ),
-            audio=AudioConfig(
-                sample_rate=int(os.getenv("AUDIO_SAMPLE_RATE", "16000")),
-                silence_threshold=float(os.getenv("AUDIO_SILENCE_THRESHOLD", "0.5")),
-                max_duration=float(os.getenv("AUDIO_MAX_DURATION", "10.0")),
-                wake_timeout=float(os.getenv("AUDIO_WAKE_TIMEOUT", "5.0")),
-            ),
-        )
+        env = os.environ
+        return cls(**{
+            section: config_cls(**{
+                name: cast(env[key]) for name, key, cast in fields if key in env
+            })
+            for section, config_cls, fields in _ENV_TABLE
+        })
 
 
 @lru_cache()
 def get_settings() -> Settings:
-    """获取全局配置单例"""
+    """获取全局配置单例（首次调用时加载 .env 文件，import 本模块不读文件系统）"""
+    load_dotenv()
     return Settings.from_env()
@@ -8,21 +8,30 @@ VoiceGrow 核心服务层
 - LLM: 大语言模型服务 (对话)
 """
 
-from .asr import ASRService, AudioBuffer
-from .nlu import NLUService, Intent, NLUResult
-from .tts import TTSService, BaseTTSService, TTSResult, create_tts_service
-from .llm import LLMService, ChatMessage
+import importlib
 
-__all__ = [
-    "ASRService",
-    "AudioBuffer",
-    "NLUService",
-    "Intent",
-    "NLUResult",
-    "TTSService",
-    "BaseTTSService",
-    "TTSResult",
-    "create_tts_service",
-    "LLMService",
-    "ChatMessage",
-]
+# 按需导入：访问属性时才加载对应子模块 (PEP 562)
+_LAZY = {
+    "ASRService": "asr",
+    "AudioBuffer": "asr",
+    "NLUService": "nlu",
+    "Intent": "nlu",
+    "NLUResult": "nlu",
+    "TTSService": "tts",
+    "BaseTTSService": "tts",
+    "TTSResult": "tts",
+    "create_tts_service": "tts",
+    "LLMService": "llm",
+    "ChatMessage": "llm",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
@@ -5,22 +5,53 @@ ASR 语音识别服务
 """
 
 import asyncio
-import io
-import struct
 import time
 import logging
-from dataclasses import dataclass, field
+from collections import deque
+from dataclasses import dataclass
 from typing import Dict, List, Optional
 
 import httpx
+import orjson
 
 from ..config import ASRConfig
-from ..utils.audio import pcm_to_wav
+from .ringbuffer import SPSCRingBuffer, next_pow2
+from ..utils.audio import calculate_peak, calculate_rms, get_audio_duration, pcm_to_wav
 from ..utils.auth import generate_hmac_signature
+from ..utils.http import HTTP_LIMITS
 
 logger = logging.getLogger(__name__)
 
 
+class AudioBufferPool:
+    """
+    录音缓冲区池
+
+    复用预分配的 bytearray，避免每次唤醒都分配一整段录音内存。
+    取出的缓冲区小于所需容量时直接分配新的，归还后池内缓冲区逐步收敛到稳定大小。
+    """
+
+    def __init__(self, max_size: int = 32):
+        self._pool: deque = deque()
+        self._max_size = max_size
+
+    def acquire(self, size: int) -> bytearray:
+        """取出容量不小于 size 的缓冲区"""
+        if self._pool:
+            buf = self._pool.pop()
+            if len(buf) >= size:
+                return buf
+        return bytearray(size)
+
+    def release(self, buf: bytearray):
+        """归还缓冲区（池满则丢弃）"""
+        if len(self._pool) < self._max_size:
+            self._pool.append(buf)
+
+
+_buffer_pool = AudioBufferPool()
+
+
 @dataclass
 class AudioBuffer:
     """
@@ -41,13 +72,21 @@ class AudioBuffer:
 
     # 能量阈值 (RMS)
     energy_threshold: int = 500
+    # VAD 能量估算的采样步长：每 vad_stride 个采样取一个，阈值判断无需逐采样计算
+    vad_stride: int = 8
+    # 至少检测到这么多语音帧才算"有语音"，否则整段录音按静音处理（跳过 ASR）
+    min_voiced_frames: int = 3
+    # 开口前静音帧丢弃阈值 (峰值幅度)：检测到语音前，峰值低于此值的帧不写入缓冲
+    silence_floor: int = 100
 
     # 内部状态
-    _buffer: bytearray = field(default_factory=bytearray)
+    _ring: Optional[SPSCRingBuffer] = None  # 录音环形缓冲（底层 bytearray 来自 _buffer_pool）
     _is_recording: bool = False
-    _last_voice_time: float = 0.0
+    _last_voice_time: float = 0.0  # 时间戳均为 time.monotonic()，不受系统时钟调整影响
     _start_time: float = 0.0
     _speech_detected: bool = False  # 是否检测到过语音（用于区分"说话后沉默"和"从未说话"）
+    _voiced_frames: int = 0         # 本次录音中超过能量阈值的帧数
+    _overflow: bool = False         # 环形缓冲已写满（之后的数据被截断，should_stop 立即判停）
 
     # 连续对话：持续语音检测（WAITING_SPEECH 状态用）
     _consecutive_voice_start: float = 0.0   # 连续语音起始时间
@@ -55,11 +94,20 @@ class AudioBuffer:
 
     def start(self):
         """开始录音"""
-        self._buffer = bytearray()
+        capacity = next_pow2(int(self.max_duration * self.sample_rate * self.sample_width * self.channels))
+        if self._ring is None or self._ring.capacity < capacity:
+            old_ring = self._ring
+            self._ring = SPSCRingBuffer(capacity, _buffer_pool.acquire(capacity))
+            if old_ring is not None:
+                # 旧缓冲容量不够（max_duration 调大）：取到新缓冲后再交还池中，供其他连接复用
+                _buffer_pool.release(old_ring.release())
+        else:
+            self._ring.clear()
         self._is_recording = True
-        self._start_time = time.time()
-        self._last_voice_time = time.time()
+        self._start_time = self._last_voice_time = time.monotonic()
         self._speech_detected = False
+        self._voiced_frames = 0
+        self._overflow = False
         self._consecutive_voice_start = 0.0
         self._consecutive_voice_active = False
         logger.debug("AudioBuffer: 开始录音")
@@ -74,20 +122,33 @@ class AudioBuffer:
         if not self._is_recording:
             return
 
-        self._buffer.extend(data)
-
         # 检测语音活动
         if self._has_voice_activity(data):
-            self._last_voice_time = time.time()
+            self._last_voice_time = time.monotonic()
             self._speech_detected = True
+            self._voiced_frames += 1
+        elif not self._speech_detected and calculate_peak(data) < self.silence_floor:
+            # 开口前的近乎无声帧直接丢弃，不占用缓冲带宽
+            return
+
+        if not self._ring.write(data) and not self._overflow:
+            self._overflow = True
+            logger.warning(
+                f"AudioBuffer: 录音缓冲已满 ({self._ring.capacity} bytes)，截断后续音频并停止录音"
+            )
 
     def should_stop(self) -> bool:
         """判断是否应该停止录音"""
         if not self._is_recording:
             return True
 
-        elapsed = time.time() - self._start_time
-        silence_duration = time.time() - self._last_voice_time
+        # 缓冲已满：再录下去只会丢数据
+        if self._overflow:
+            return True
+
+        now = time.monotonic()
+        elapsed = now - self._start_time
+        silence_duration = now - self._last_voice_time
 
         # 超过最大时长
         if elapsed >= self.max_duration:
@@ -108,21 +169,31 @@ class AudioBuffer:
         return False
 
     def stop(self) -> bytes:
-        """停止录音并返回音频数据"""
+        """停止录音并返回音频数据（缓冲区归还到池中）"""
         self._is_recording = False
-        audio_data = bytes(self._buffer)
+        if self._ring is None:
+            return b""
+        audio_data = self._ring.read_all()
+        _buffer_pool.release(self._ring.release())
+        self._ring = None
         duration = len(audio_data) / (self.sample_rate * self.sample_width * self.channels)
         logger.info(f"AudioBuffer: 录音完成，时长 {duration:.2f}s，大小 {len(audio_data)} bytes")
         return audio_data
 
     def get_duration(self) -> float:
         """获取当前录音时长"""
-        return len(self._buffer) / (self.sample_rate * self.sample_width * self.channels)
+        size = len(self._ring) if self._ring is not None else 0
+        return size / (self.sample_rate * self.sample_width * self.channels)
 
     @property
     def is_recording(self) -> bool:
         return self._is_recording
 
+    @property
+    def has_speech(self) -> bool:
+        """本次录音是否包含足够的语音帧"""
+        return self._voiced_frames >= self.min_voiced_frames
+
     def has_sustained_speech(self, data: bytes, min_duration_ms: int = 300) -> bool:
         """检测是否有持续语音（用于 WAITING_SPEECH 状态）
 
@@ -135,9 +206,10 @@ class AudioBuffer:
         Returns:
             是否检测到持续语音
         """
-        has_voice = self._has_voice_activity(data)
+        # RMS 不会超过峰值：峰值未过阈值的静音帧无需再算 RMS
+        has_voice = calculate_peak(data) > self.energy_threshold and self._has_voice_activity(data)
         if has_voice:
-            now = time.time()
+            now = time.monotonic()
             if not self._consecutive_voice_active:
                 self._consecutive_voice_active = True
                 self._consecutive_voice_start = now
@@ -148,12 +220,27 @@ class AudioBuffer:
                 return True
         else:
             if self._consecutive_voice_active:
-                elapsed_ms = (time.time() - self._consecutive_voice_start) * 1000 if self._consecutive_voice_start > 0 else 0
+                elapsed_ms = (time.monotonic() - self._consecutive_voice_start) * 1000 if self._consecutive_voice_start > 0 else 0
                 logger.debug(f"[DIAG] 持续语音中断: 连续 {elapsed_ms:.0f}ms 后断开")
             self._consecutive_voice_active = False
             self._consecutive_voice_start = 0.0
         return False
 
+    def reset(self):
+        """重置录音与语音检测状态
+
+        保留配置和已分配的环形缓冲，连接生命周期内复用同一个 AudioBuffer。
+        """
+        self._is_recording = False
+        if self._ring is not None:
+            self._ring.clear()
+        self._last_voice_time = 0.0
+        self._start_time = 0.0
+        self._speech_detected = False
+        self._voiced_frames = 0
+        self._overflow = False
+        self.reset_sustained_speech()
+
     def reset_sustained_speech(self):
         """重置持续语音检测状态"""
         self._consecutive_voice_active = False
@@ -169,19 +256,7 @@ class AudioBuffer:
         Returns:
             是否检测到语音
         """
-        if len(data) < 2:
-            return False
-
-        try:
-            # 计算 RMS 能量
-            samples = struct.unpack(f"<{len(data) // 2}h", data)
-            if len(samples) == 0:
-                return False
-
-            rms = (sum(s ** 2 for s in samples) / len(samples)) ** 0.5
-            return rms > self.energy_threshold
-        except struct.error:
-            return False
+        return calculate_rms(data, self.vad_stride) > self.energy_threshold
 
 
 @dataclass
@@ -207,6 +282,8 @@ class ASRService:
 
     # 可重试的 HTTP 状态码 (服务端暂时错误)
     _RETRYABLE_STATUS = {500, 502, 503, 504}
+    # 短于此时长 (秒) 的语音使用贪心解码 (beam_size=1)：短指令准确率几乎无差别，解码更快
+    _GREEDY_MAX_SECONDS = 3.0
 
     def __init__(self, config: ASRConfig):
         self.config = config
@@ -226,6 +303,7 @@ class ASRService:
                             write=10.0,
                             pool=5.0,
                         ),
+                        limits=HTTP_LIMITS,
                     )
         return self._client
 
@@ -292,6 +370,10 @@ class ASRService:
         """
         # PCM → WAV
         wav_data = pcm_to_wav(audio_data, sample_rate=sample_rate)
+        if get_audio_duration(audio_data, sample_rate) < self._GREEDY_MAX_SECONDS:
+            beam_size = 1
+        else:
+            beam_size = self.config.beam_size
 
         last_error: Optional[Exception] = None
 
@@ -302,7 +384,7 @@ class ASRService:
                 logger.info(f"ASR 重试第 {attempt} 次...")
 
             try:
-                return await self._do_transcribe(wav_data)
+                return await self._do_transcribe(wav_data, beam_size)
             except httpx.HTTPStatusError as e:
                 last_error = e
                 if e.response.status_code not in self._RETRYABLE_STATUS:
@@ -330,7 +412,7 @@ class ASRService:
             logger.error(f"ASR transcription failed: {last_error}")
             raise Exception("语音识别服务不可用") from last_error
 
-    async def _do_transcribe(self, wav_data: bytes) -> ASRResult:
+    async def _do_transcribe(self, wav_data: bytes, beam_size: int) -> ASRResult:
         """执行单次转录请求"""
         path = "/api/v1/stt/transcribe"
         timestamp, signature = self._sign("POST", path)
@@ -343,12 +425,12 @@ class ASRService:
 
         params = {
             "language": self.config.language,
-            "beam_size": self.config.beam_size,
+            "beam_size": beam_size,
             "vad_filter": str(self.config.vad_filter).lower(),
         }
 
         files = {
-            "file": ("audio.wav", io.BytesIO(wav_data), "audio/wav"),
+            "file": ("audio.wav", wav_data, "audio/wav"),
         }
 
         client = await self._get_client()
@@ -357,7 +439,7 @@ class ASRService:
             path, headers=headers, params=params, files=files,
         )
         response.raise_for_status()
-        result = response.json()
+        result = orjson.loads(response.content)
 
         text = result.get("text", "").strip()
         logger.info(
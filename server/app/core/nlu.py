@@ -6,6 +6,7 @@ NLU 自然语言理解服务
 
 import re
 import logging
+from collections import OrderedDict
 from enum import Enum
 from dataclasses import dataclass
 from typing import Optional, List, Tuple, Dict, Any
@@ -69,6 +70,24 @@ class NLUResult:
         return f"NLUResult(intent={self.intent.value}, slots={self.slots}, confidence={self.confidence:.2f})"
 
 
+# 高频固定指令精确匹配表: 文本 → 意图（命中时跳过正则与 LLM）
+EXACT_COMMANDS: Dict[str, Intent] = {
+    **dict.fromkeys(("暂停", "停一下", "停下", "停止播放"), Intent.CONTROL_PAUSE),
+    **dict.fromkeys(("继续", "继续播放"), Intent.CONTROL_RESUME),
+    **dict.fromkeys(("停止", "停", "关闭", "别放了"), Intent.CONTROL_STOP),
+    **dict.fromkeys(("下一首", "下一个", "切歌", "换一首", "换一个"), Intent.CONTROL_NEXT),
+    **dict.fromkeys(("上一首", "上一个"), Intent.CONTROL_PREVIOUS),
+    **dict.fromkeys(("大声点", "大点声", "调大", "音量大一点", "声音大一点"), Intent.CONTROL_VOLUME_UP),
+    **dict.fromkeys(("小声点", "小点声", "调小", "音量小一点", "声音小一点"), Intent.CONTROL_VOLUME_DOWN),
+    **dict.fromkeys(("几点了", "现在几点", "现在几点了"), Intent.SYSTEM_TIME),
+}
+
+# ASR 结果常带的尾部标点
+_TRAILING_PUNCT = "。！？!?，,. "
+
+# LLM 分类结果缓存条数（按文本缓存，孩子常重复同一句话）
+LLM_CACHE_SIZE = 256
+
 
 class NLUService:
     """
@@ -86,58 +105,66 @@ class NLUService:
         """
         self.llm_service = llm_service
         self.rules = self._init_rules()
-
-    def _init_rules(self) -> List[Tuple[str, Intent, Dict[str, int]]]:
+        self._llm_cache: "OrderedDict[str, NLUResult]" = OrderedDict()
+        # 关键词 → 规则下标：只有文本中出现了某条规则的关键词，才需要跑该规则的正则
+        self._dispatch: Dict[str, List[int]] = {}
+        for idx, (_, _, _, keywords) in enumerate(self.rules):
+            for keyword in keywords:
+                self._dispatch.setdefault(keyword, []).append(idx)
+
+    def _init_rules(self) -> List[Tuple[re.Pattern, Intent, Dict[str, int], Tuple[str, ...]]]:
         """
         初始化意图规则
 
-        返回: [(正则表达式, 意图, 槽位映射)]
+        返回: [(预编译正则, 意图, 槽位映射, 关键词)]
         槽位映射: {槽位名: 正则组索引}
+        关键词: 该规则任一匹配结果必定包含其中之一（用于预筛选，漏写会导致规则失效）
         """
-        return [
+        rules = [
             # ========== 故事播放 ==========
             # 分类故事（精确关键词，regex 可靠）
-            (r'(播放|来点?|讲)(睡前故事|童话故事|寓言故事|科普故事|成语故事|历史故事|神话故事)', Intent.PLAY_STORY_CATEGORY, {'category': 2}),
+            (r'(播放|来点?|讲)(睡前故事|童话故事|寓言故事|科普故事|成语故事|历史故事|神话故事)', Intent.PLAY_STORY_CATEGORY, {'category': 2}, ("故事",)),
             # 通用: "讲个故事", "来点故事"（无名字提取，regex 可靠）
-            (r'(讲|说|播放|来)(一?(个|首)|点)?故事$', Intent.PLAY_STORY, {}),
+            (r'(讲|说|播放|来)(一?(个|首)|点)?故事$', Intent.PLAY_STORY, {}, ("故事",)),
             # 含故事名的请求 → 不用 regex 提取名字，交给 LLM（跳过，走 LLM 兜底）
 
             # ========== 音乐播放 ==========
             # 分类音乐（精确关键词，regex 可靠）
-            (r'(播放|放|来点?)(儿歌|摇篮曲|胎教音乐|胎教|古典音乐|古典|流行|英文歌)', Intent.PLAY_MUSIC_CATEGORY, {'category': 2}),
+            (r'(播放|放|来点?)(儿歌|摇篮曲|胎教音乐|胎教|古典音乐|古典|流行|英文歌)', Intent.PLAY_MUSIC_CATEGORY, {'category': 2}, ("放", "来")),
             # 通用: "播放音乐", "来首歌"（无名字提取，regex 可靠）
-            (r'(播放|放|来)(一?首|点)?音乐$', Intent.PLAY_MUSIC, {}),
-            (r'(播放|放|来)(一?首|点)?歌$', Intent.PLAY_MUSIC, {}),
+            (r'(播放|放|来)(一?首|点)?音乐$', Intent.PLAY_MUSIC, {}, ("音乐",)),
+            (r'(播放|放|来)(一?首|点)?歌$', Intent.PLAY_MUSIC, {}, ("歌",)),
             # 含歌名/歌手的请求 → 交给 LLM 提取 slots
 
             # ========== 播放控制 ==========
-            (r'^(暂停|停一?下|停止播放)$', Intent.CONTROL_PAUSE, {}),
-            (r'^(继续|继续播放)$', Intent.CONTROL_RESUME, {}),
-            (r'^(停止|停|关闭|别放了)$', Intent.CONTROL_STOP, {}),
-            (r'(下一个|下一首|切歌|换一个|换一首)', Intent.CONTROL_NEXT, {}),
-            (r'(上一个|上一首)', Intent.CONTROL_PREVIOUS, {}),
-            (r'(大声点|音量大一点|声音大一点|调大|大点声)', Intent.CONTROL_VOLUME_UP, {}),
-            (r'(小声点|音量小一点|声音小一点|调小|小点声)', Intent.CONTROL_VOLUME_DOWN, {}),
-            (r'(单曲循环|列表循环|随机播放|顺序播放)', Intent.CONTROL_PLAY_MODE, {'play_mode': 1}),
+            (r'^(暂停|停一?下|停止播放)$', Intent.CONTROL_PAUSE, {}, ("停",)),
+            (r'^(继续|继续播放)$', Intent.CONTROL_RESUME, {}, ("继续",)),
+            (r'^(停止|停|关闭|别放了)$', Intent.CONTROL_STOP, {}, ("停", "关闭", "别放了")),
+            (r'(下一个|下一首|切歌|换一个|换一首)', Intent.CONTROL_NEXT, {}, ("下一", "切歌", "换一")),
+            (r'(上一个|上一首)', Intent.CONTROL_PREVIOUS, {}, ("上一",)),
+            (r'(大声点|音量大一点|声音大一点|调大|大点声)', Intent.CONTROL_VOLUME_UP, {}, ("大声点", "音量大一点", "声音大一点", "调大", "大点声")),
+            (r'(小声点|音量小一点|声音小一点|调小|小点声)', Intent.CONTROL_VOLUME_DOWN, {}, ("小声点", "音量小一点", "声音小一点", "调小", "小点声")),
+            (r'(单曲循环|列表循环|随机播放|顺序播放)', Intent.CONTROL_PLAY_MODE, {'play_mode': 1}, ("循环", "随机播放", "顺序播放")),
 
             # ========== 英语学习 ==========
-            (r'(学英语|英语学习|学习英语|教我英语)', Intent.ENGLISH_LEARN, {}),
-            (r'(.+)(用英语|英文)(怎么说|怎么读)', Intent.ENGLISH_WORD, {'word': 1}),
-            (r'(英语|英文)怎么说(.+)', Intent.ENGLISH_WORD, {'word': 2}),
-            (r'(跟我读|跟读)(.+)', Intent.ENGLISH_FOLLOW, {'word': 2}),
-            (r'(.+)(英语|英文)怎么读', Intent.ENGLISH_WORD, {'word': 1}),
+            (r'(学英语|英语学习|学习英语|教我英语)', Intent.ENGLISH_LEARN, {}, ("英语",)),
+            (r'(.+)(用英语|英文)(怎么说|怎么读)', Intent.ENGLISH_WORD, {'word': 1}, ("怎么",)),
+            (r'(英语|英文)怎么说(.+)', Intent.ENGLISH_WORD, {'word': 2}, ("怎么说",)),
+            (r'(跟我读|跟读)(.+)', Intent.ENGLISH_FOLLOW, {'word': 2}, ("跟读", "跟我读")),
+            (r'(.+)(英语|英文)怎么读', Intent.ENGLISH_WORD, {'word': 1}, ("怎么读",)),
 
             # ========== 内容管理 ==========
-            (r'(删除|删掉|移除)(.+)', Intent.DELETE_CONTENT, {'content_name': 2}),
+            (r'(删除|删掉|移除)(.+)', Intent.DELETE_CONTENT, {'content_name': 2}, ("删", "移除")),
 
             # ========== 系统查询 ==========
-            (r'(现在)?几点(了|钟)?', Intent.SYSTEM_TIME, {}),
-            (r'(什么)?时间', Intent.SYSTEM_TIME, {}),
-            (r'(今天)?(周几|星期几)', Intent.SYSTEM_TIME, {}),
-            (r'(今天|明天|后天)?.{0,2}(天气|气温|温度)', Intent.SYSTEM_WEATHER, {}),
-            (r'(外面|今天)(冷|热|下雨|下雪)吗', Intent.SYSTEM_WEATHER, {}),
-            (r'(要不要|需不需要)(带伞|穿外套)', Intent.SYSTEM_WEATHER, {}),
+            (r'(现在)?几点(了|钟)?', Intent.SYSTEM_TIME, {}, ("几点",)),
+            (r'(什么)?时间', Intent.SYSTEM_TIME, {}, ("时间",)),
+            (r'(今天)?(周几|星期几)', Intent.SYSTEM_TIME, {}, ("周几", "星期几")),
+            (r'(今天|明天|后天)?.{0,2}(天气|气温|温度)', Intent.SYSTEM_WEATHER, {}, ("天气", "气温", "温度")),
+            (r'(外面|今天)(冷|热|下雨|下雪)吗', Intent.SYSTEM_WEATHER, {}, ("吗",)),
+            (r'(要不要|需不需要)(带伞|穿外套)', Intent.SYSTEM_WEATHER, {}, ("带伞", "穿外套")),
         ]
+        return [(re.compile(pattern), intent, slot_mapping, keywords) for pattern, intent, slot_mapping, keywords in rules]
 
     async def recognize(self, text: str) -> NLUResult:
         """
@@ -160,6 +187,13 @@ class NLUService:
 
         logger.debug(f"NLU 识别输入: '{text}'")
 
+        # 0. 固定指令精确匹配
+        intent = EXACT_COMMANDS.get(text.rstrip(_TRAILING_PUNCT))
+        if intent is not None:
+            result = NLUResult(intent=intent, slots={}, confidence=0.9, raw_text=text)
+            logger.info(f"NLU 精确匹配: {result}")
+            return result
+
         # 1. 规则匹配
         result = self._rule_match(text)
         if result and result.confidence >= 0.8:
@@ -189,15 +223,21 @@ class NLUService:
         return default_result
 
     def _rule_match(self, text: str) -> Optional[NLUResult]:
-        """规则匹配"""
-        for pattern, intent, slot_mapping in self.rules:
-            match = re.search(pattern, text)
+        """规则匹配（按关键词预筛选候选规则，保持规则原有优先级）"""
+        candidates = sorted({
+            idx
+            for keyword, indices in self._dispatch.items() if keyword in text
+            for idx in indices
+        })
+        for idx in candidates:
+            pattern, intent, slot_mapping, _ = self.rules[idx]
+            match = pattern.search(text)
             if match:
                 slots = {}
 
                 # 提取槽位
                 for slot_name, group_idx in slot_mapping.items():
-                    if isinstance(group_idx, int) and group_idx <= len(match.groups()):
+                    if isinstance(group_idx, int) and group_idx <= pattern.groups:
                         value = match.group(group_idx)
                         if value:
                             slots[slot_name] = value.strip()
@@ -229,6 +269,16 @@ class NLUService:
                 raw_text=text
             )
 
+        cached = self._llm_cache.get(text)
+        if cached is not None:
+            self._llm_cache.move_to_end(text)
+            return NLUResult(
+                intent=cached.intent,
+                slots=dict(cached.slots),
+                confidence=cached.confidence,
+                raw_text=text
+            )
+
         try:
             # 构建分类提示
             prompt = self._build_classification_prompt(text)
@@ -238,10 +288,23 @@ class NLUService:
                 system_message="你是一个精确的意图分类和实体提取系统。只返回JSON，不要返回任何其他内容。",
                 use_cache=False,
             )
-            response = result.response
+            # LLMService 出错/被内容过滤时不抛异常，而是返回兜底话术
+            call_ok = result.model_used not in ("error", "content_filter")
 
             # 解析 LLM 响应
-            return self._parse_llm_response(response, text)
+            parsed, is_json = self._decode_llm_response(result.response, text)
+
+            # 只缓存真正成功的分类：失败的兜底结果不能把这句话长期钉在闲聊上
+            if call_ok and is_json:
+                self._llm_cache[text] = NLUResult(
+                    intent=parsed.intent,
+                    slots=dict(parsed.slots),
+                    confidence=parsed.confidence,
+                    raw_text=text
+                )
+                if len(self._llm_cache) > LLM_CACHE_SIZE:
+                    self._llm_cache.popitem(last=False)
+            return parsed
 
         except Exception as e:
             logger.error(f"LLM 分类失败: {e}")
@@ -296,6 +359,14 @@ slots只包含提取到的实体，没有则为空对象。
 
     def _parse_llm_response(self, response: str, raw_text: str) -> NLUResult:
         """解析 LLM 响应（JSON 格式）"""
+        return self._decode_llm_response(response, raw_text)[0]
+
+    def _decode_llm_response(self, response: str, raw_text: str) -> Tuple[NLUResult, bool]:
+        """解析 LLM 响应
+
+        Returns:
+            (NLUResult, 是否按 JSON 解析成功)；非 JSON 时按纯文本意图回退
+        """
         import json
 
         intent_mapping = {
@@ -325,6 +396,7 @@ slots只包含提取到的实体，没有则为空对象。
         # 尝试解析 JSON
         slots = {}
         intent_str = 'chat'
+        is_json = False
         try:
             # 提取 JSON（LLM 可能返回 markdown 包裹的 JSON）
             text = response.strip()
@@ -338,6 +410,7 @@ slots只包含提取到的实体，没有则为空对象。
             slots = data.get('slots', {})
             if not isinstance(slots, dict):
                 slots = {}
+            is_json = True
         except (json.JSONDecodeError, KeyError, AttributeError):
             # JSON 解析失败，回退到纯文本意图匹配
             intent_str = response.strip().lower()
@@ -350,4 +423,4 @@ slots只包含提取到的实体，没有则为空对象。
             slots=slots,
             confidence=0.7 if intent != Intent.CHAT else 0.5,
             raw_text=raw_text
-        )
+        ), is_json
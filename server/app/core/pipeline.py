@@ -7,17 +7,38 @@
 
 import asyncio
 import logging
-from typing import Optional, Dict, TYPE_CHECKING
+from collections import OrderedDict
+from typing import Callable, Optional, Dict, TYPE_CHECKING
 
 from .asr import ASRService
 from .nlu import NLUService
-from .tts import TTSService
+from .tts import TTSService, TTSResult
+from ..models.protocol import Request
 
 if TYPE_CHECKING:
     from ..api.websocket import DeviceConnection
 
 logger = logging.getLogger(__name__)
 
+# 固定提示语
+MSG_NOT_HEARD = "抱歉，我没有听清楚，请再说一遍"
+MSG_NOT_HEARD_IN_SESSION = "我没听清，你再说一遍？"
+MSG_ERROR = "抱歉，出了点问题，请稍后再试"
+
+# HandlerResponse.commands → 设备请求工厂
+COMMAND_REQUESTS: Dict[str, Callable[[], Request]] = {
+    "pause": Request.pause,
+    "play": Request.play,
+    "volume_up": Request.volume_up,
+    "volume_down": Request.volume_down,
+}
+
+# TTS 结果进程内 LRU 缓存容量
+TTS_CACHE_SIZE = 512
+
+# 静音判定：整段录音过短或语音帧不足（AudioBuffer.has_speech）→ 不调用 ASR
+MIN_AUDIO_SECONDS = 0.2         # 字节数按连接的音频配置换算
+
 
 class VoicePipeline:
     """
@@ -43,6 +64,32 @@ class VoicePipeline:
         self.play_queue_service = play_queue_service
         self.content_service = content_service
 
+        # TTS 结果 LRU 缓存: text → TTSResult（提示语/确认语高度重复，命中时省去一次 TTS 往返）
+        self._tts_cache: "OrderedDict[str, TTSResult]" = OrderedDict()
+
+    async def synthesize(self, text: str) -> TTSResult:
+        """合成 TTS（带进程内 LRU 缓存）"""
+        cached = self._tts_cache.get(text)
+        if cached is not None:
+            self._tts_cache.move_to_end(text)
+            return cached
+
+        result = await self.tts.synthesize(text)
+        self._tts_cache[text] = result
+        if len(self._tts_cache) > TTS_CACHE_SIZE:
+            self._tts_cache.popitem(last=False)
+        return result
+
+    async def warm_up_tts(self):
+        """预热固定提示语的 TTS 缓存（各条并行合成，单条失败只记录警告）"""
+        async def _warm(text: str):
+            try:
+                await self.synthesize(text)
+            except Exception as e:
+                logger.warning(f"TTS 预热失败 ('{text}'): {e}")
+
+        await asyncio.gather(*(_warm(text) for text in (MSG_NOT_HEARD, MSG_NOT_HEARD_IN_SESSION, MSG_ERROR)))
+
     @staticmethod
     def _estimate_tts_duration(text: str) -> float:
         """估算 TTS 播放时长（回退：当 TTS API 未返回真实 duration_ms 时使用）"""
@@ -52,14 +99,12 @@ class VoicePipeline:
         """构建 handler 上下文（play_tts, play_url, set_pending_action）"""
         async def _play_tts(text):
             from ..api.websocket import manager
-            from ..models.protocol import Request
-            url = await self.tts.synthesize_to_url(text)
+            url = (await self.synthesize(text)).audio_url
             conn._handler_playback_count += 1
             await manager.send_request(conn.device_id, Request.play_url(url))
 
         async def _play_url(url):
             from ..api.websocket import manager
-            from ..models.protocol import Request
             conn._handler_playback_count += 1
             await manager.send_request(conn.device_id, Request.play_url(url))
 
@@ -137,7 +182,7 @@ class VoicePipeline:
         except Exception as e:
             logger.error(f"文本处理失败: {e}", exc_info=True)
             try:
-                error_response = HandlerResponse(text="抱歉，出了点问题，请稍后再试")
+                error_response = HandlerResponse(text=MSG_ERROR)
                 await self.respond(conn, error_response)
             except Exception:
                 pass
@@ -146,7 +191,8 @@ class VoicePipeline:
         self,
         audio_data: bytes,
         device_id: str,
-        conn: "DeviceConnection"
+        conn: "DeviceConnection",
+        has_speech: bool,
     ):
         """
         处理音频数据
@@ -155,6 +201,7 @@ class VoicePipeline:
             audio_data: PCM 音频数据
             device_id: 设备 ID
             conn: 设备连接
+            has_speech: 录音是否包含足够的语音帧（AudioBuffer.has_speech），否则不调用 ASR
 
         Returns:
             处理结果 (HandlerResponse)
@@ -162,16 +209,23 @@ class VoicePipeline:
         from ..handlers import HandlerResponse
 
         try:
-            # 1. ASR 语音识别
-            logger.info(f"开始 ASR 识别，音频大小: {len(audio_data)} bytes")
-            text = await self.asr.transcribe(audio_data)
+            # 0. 静音快速判定：跳过远程 ASR，直接按"没听清"处理
+            cfg = conn.audio_cfg
+            min_bytes = int(MIN_AUDIO_SECONDS * cfg.sample_rate * cfg.sample_width * cfg.channels)
+            if not has_speech or len(audio_data) < min_bytes:
+                logger.info(f"录音为静音，跳过 ASR，音频大小: {len(audio_data)} bytes")
+                text = ""
+            else:
+                # 1. ASR 语音识别
+                logger.info(f"开始 ASR 识别，音频大小: {len(audio_data)} bytes")
+                text = await self.asr.transcribe(audio_data)
 
             if not text or len(text.strip()) == 0:
                 logger.warning("ASR 识别结果为空")
                 # 连续对话中 ASR 为空 → 给用户再一次机会
                 if getattr(conn, '_in_conversation_session', False):
-                    return HandlerResponse(text="我没听清，你再说一遍？", continue_listening=True)
-                return HandlerResponse(text="抱歉，我没有听清楚，请再说一遍")
+                    return HandlerResponse(text=MSG_NOT_HEARD_IN_SESSION, continue_listening=True)
+                return HandlerResponse(text=MSG_NOT_HEARD)
 
             logger.info(f"ASR 识别结果: {text}")
 
@@ -194,7 +248,7 @@ class VoicePipeline:
 
         except Exception as e:
             logger.error(f"语音处理失败: {e}", exc_info=True)
-            return HandlerResponse(text="抱歉，出了点问题，请稍后再试")
+            return HandlerResponse(text=MSG_ERROR)
 
     async def respond(
         self,
@@ -209,20 +263,12 @@ class VoicePipeline:
             response: 处理器响应
         """
         from ..api.websocket import manager
-        from ..models.protocol import Request
 
+        tts_task: Optional[asyncio.Task] = None
         try:
-            # 0. 预合成 TTS（在中断播放之前完成，减少静音间隔）
-            tts_url = None
-            tts_duration = 0.0
+            # 0. 后台合成 TTS，与下方 pause + 等待并行（减少静音间隔）
             if response.text:
-                tts_result = await self.tts.synthesize(response.text)
-                tts_url = tts_result.audio_url
-                if tts_result.duration_ms > 0:
-                    tts_duration = tts_result.duration_ms / 1000.0
-                else:
-                    tts_duration = self._estimate_tts_duration(response.text)
-                    logger.debug(f"TTS duration_ms=0, 使用估算值: {tts_duration:.1f}s")
+                tts_task = asyncio.create_task(self.synthesize(response.text))
 
             # 1. 暂停媒体播放器（可通过 skip_interrupt 跳过）
             #    skip_interrupt 用于音量调节、继续播放等不应中断当前播放的场景
@@ -235,6 +281,17 @@ class VoicePipeline:
                 # 中断播放 = 队列自动续播默认关闭（除非 handler 显式恢复）
                 conn._queue_active = False
 
+            tts_url = None
+            tts_duration = 0.0
+            if tts_task is not None:
+                tts_result = await tts_task
+                tts_url = tts_result.audio_url
+                if tts_result.duration_ms > 0:
+                    tts_duration = tts_result.duration_ms / 1000.0
+                else:
+                    tts_duration = self._estimate_tts_duration(response.text)
+                    logger.debug(f"TTS duration_ms=0, 使用估算值: {tts_duration:.1f}s")
+
             # 2. 关闭 pipeline_active 拦截，防止自己的 play_url 触发的 Playing 事件被误杀
             #    此时 abort_xiaoai 已在入口点提前发送且 restart 早已完成，无需继续拦截
             conn._pipeline_active = False
@@ -267,16 +324,13 @@ class VoicePipeline:
                     Request.play_url(tts_url)
                 )
 
-            # 4. 执行额外命令
+            # 4. 执行额外命令（按顺序发送，设备端依次执行）
             for command in response.commands:
-                if command == "pause":
-                    await manager.send_request(conn.device_id, Request.pause())
-                elif command == "play":
-                    await manager.send_request(conn.device_id, Request.play())
-                elif command == "volume_up":
-                    await manager.send_request(conn.device_id, Request.volume_up())
-                elif command == "volume_down":
-                    await manager.send_request(conn.device_id, Request.volume_down())
+                factory = COMMAND_REQUESTS.get(command)
+                if factory is not None:
+                    await manager.send_request(conn.device_id, factory())
+                else:
+                    logger.warning(f"未知附加命令: {command}")
 
             # 5. 显式更新队列活跃状态
             #    True=启用, False=关闭, None=不改变（保持 step 1 的默认值）
@@ -292,3 +346,7 @@ class VoicePipeline:
         except Exception as e:
             logger.error(f"响应执行失败: {e}", exc_info=True)
             conn._continue_listening_pending = False  # 响应失败不启动连续对话
+        finally:
+            # 异常或被取消（唤醒词打断 pipeline worker）时，不让后台合成继续跑
+            if tts_task is not None and not tts_task.done():
+                tts_task.cancel()
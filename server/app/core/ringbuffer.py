@@ -0,0 +1,78 @@
+"""
+单生产者/单消费者环形字节缓冲
+
+录音场景: WebSocket 接收协程写入，录音完成后由处理协程一次性读出。
+两端各只有一个协程，head/tail 为普通 int 即可，无需加锁。
+"""
+
+from typing import Optional
+
+
+def next_pow2(n: int) -> int:
+    """不小于 n 的最小 2 的幂"""
+    return 1 << max(n - 1, 0).bit_length()
+
+
+class SPSCRingBuffer:
+    """
+    固定容量环形字节缓冲
+
+    容量取 2 的幂，回绕下标用 `idx & mask` 计算。
+    head/tail 单调递增；写满后不覆盖未读数据，超出部分丢弃并由 write 返回 False。
+    """
+
+    def __init__(self, capacity_bytes: int, buf: Optional[bytearray] = None):
+        capacity = next_pow2(capacity_bytes)
+        if buf is None or len(buf) < capacity:
+            buf = bytearray(capacity)
+        self.buf = buf
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self._view = memoryview(buf)
+        self.head = 0  # 读位置（消费者）
+        self.tail = 0  # 写位置（生产者）
+
+    def __len__(self) -> int:
+        return self.tail - self.head
+
+    def write(self, data: bytes) -> bool:
+        """写入数据（生产者端）
+
+        Returns:
+            是否完整写入；剩余空间不足时只写入能容纳的前段，返回 False
+        """
+        n = len(data)
+        free = self.capacity - (self.tail - self.head)
+        complete = n <= free
+        if not complete:
+            data = data[:free]
+            n = free
+
+        start = self.tail & self._mask
+        first = min(n, self.capacity - start)
+        self._view[start:start + first] = data[:first]
+        if first < n:
+            self._view[:n - first] = data[first:]
+        self.tail += n
+        return complete
+
+    def read_all(self) -> bytes:
+        """读出全部未读数据（消费者端）"""
+        size = self.tail - self.head
+        start = self.head & self._mask
+        end = start + size
+        if end <= self.capacity:
+            data = bytes(self._view[start:end])
+        else:
+            data = bytes(self._view[start:self.capacity]) + bytes(self._view[:end - self.capacity])
+        self.head = self.tail
+        return data
+
+    def clear(self):
+        """清空（不释放底层内存）"""
+        self.head = self.tail = 0
+
+    def release(self) -> bytearray:
+        """释放 memoryview 并交还底层 bytearray（之后不可再使用）"""
+        self._view.release()
+        return self.buf
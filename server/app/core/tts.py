@@ -15,9 +15,11 @@ from typing import Optional
 from dataclasses import dataclass
 
 import httpx
+import orjson
 
 from ..config import TTSConfig
 from ..utils.auth import generate_hmac_signature
+from ..utils.http import HTTP_LIMITS
 
 logger = logging.getLogger(__name__)
 
@@ -149,6 +151,7 @@ class AIManagerTTSService(BaseTTSService):
                             write=10.0,
                             pool=5.0,
                         ),
+                        limits=HTTP_LIMITS,
                     )
         return self._client
 
@@ -250,9 +253,9 @@ class AIManagerTTSService(BaseTTSService):
         }
 
         client = await self._get_client()
-        response = await client.post(path, headers=headers, json=data)
+        response = await client.post(path, headers=headers, content=orjson.dumps(data))
         response.raise_for_status()
-        result = response.json()
+        result = orjson.loads(response.content)
 
         logger.info(
             f"TTS synthesized: {len(data.get('text', ''))} chars, "
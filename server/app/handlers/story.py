@@ -8,13 +8,13 @@ import logging
 import time
 from typing import Optional, Dict, TYPE_CHECKING
 
-import httpx
 from pypinyin import lazy_pinyin
 from ..core.nlu import Intent, NLUResult
 from ..core.tts import TTSService
 from ..core.llm import LLMService, ContentFilter
 from ..models.database import ContentType
 from ..services.content_service import ContentService
+from ..utils.http import get_http_client
 from .base import BaseHandler, HandlerResponse
 
 if TYPE_CHECKING:
@@ -269,10 +269,9 @@ class StoryHandler(BaseHandler):
         失败时降级为直接存储原始 URL。
         """
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                resp = await client.get(audio_url)
-                resp.raise_for_status()
-                audio_bytes = resp.content
+            resp = await get_http_client().get(audio_url)
+            resp.raise_for_status()
+            audio_bytes = resp.content
 
             name_hash = hashlib.md5(name.encode()).hexdigest()[:8]
             ts = int(time.time())
@@ -36,6 +36,7 @@ from .services.download_service import DownloadService
 from .services.vector_service import VectorSearchService
 from .models.response import ErrorCode, BusinessException, error_response
 from .utils.logger import setup_logging
+from .utils.http import close_http_client
 from .config import Settings
 
 # 配置日志
@@ -158,6 +159,16 @@ async def lifespan(app: FastAPI):
         )
         logger.info("向量全量索引已在后台启动")
 
+    # 预热固定提示语 TTS 缓存（后台执行，ai-manager 无响应时不拖住启动）
+    app.state.tts_warm_up_task = asyncio.create_task(pipeline.warm_up_tts())
+
+    # DEBUG 模式：开启 asyncio 调试，单次回调占用事件循环超过 50ms 时由 asyncio 记录告警
+    # （同步 CPU 工作会卡住所有设备的消息处理，借此定位）
+    if settings.server.debug:
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        loop.slow_callback_duration = 0.05
+
     logger.info("=" * 50)
     logger.info(f"VoiceGrow Server 启动完成!")
     logger.info(f"WebSocket 端口: {settings.server.websocket_port}")
@@ -168,10 +179,14 @@ async def lifespan(app: FastAPI):
 
     # 清理资源
     logger.info("VoiceGrow Server 关闭中...")
+    app.state.tts_warm_up_task.cancel()
     await asr_service.close()
     await tts_service.close()
     await llm_service.close()
     await session_service.close()
+    if vector_service:
+        vector_service.close()
+    await close_http_client()
     await close_redis_service()
     await engine.dispose()
     logger.info("VoiceGrow Server 已关闭")
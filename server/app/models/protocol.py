@@ -8,8 +8,24 @@ WebSocket 消息格式: JSON (Event/Request/Response) + Binary (Stream)
 from enum import Enum
 from dataclasses import dataclass, field
 from typing import Optional, Any, Dict
+import itertools
 import uuid
-import json
+
+import orjson
+
+
+# 请求 ID: 进程级前缀 + 自增序号（比 uuid4 便宜；前缀避免重启后与设备端残留响应撞号）
+_REQUEST_ID_PREFIX = uuid.uuid4().hex[:8]
+_request_id_counter = itertools.count(1)
+
+
+def next_request_id() -> str:
+    """生成请求 ID"""
+    return f"{_REQUEST_ID_PREFIX}-{next(_request_id_counter)}"
+
+
+# Event 惰性解析缓存的"尚未解析"标记（None 是合法的解析结果）
+_UNPARSED = object()
 
 
 class MessageType(Enum):
@@ -51,6 +67,13 @@ class ListeningState(Enum):
     WAITING_SPEECH = "waiting_speech"  # 等待用户开口 (连续对话)
 
 
+# 云端下发的播放/TTS 执行指令 (namespace, name)
+_CLOUD_PLAYBACK_HEADERS = frozenset({
+    ("AudioPlayer", "Play"),
+    ("SpeechSynthesizer", "Speak"),
+})
+
+
 @dataclass
 class Event:
     """
@@ -65,6 +88,10 @@ class Event:
     event: str                          # 事件类型: kws, playing, instruction
     data: Optional[Any] = None
 
+    # instruction 事件的 NewLine 内层 JSON 及 (text, is_final) 解析结果，首次访问时解析并缓存
+    _inner: Any = field(default=_UNPARSED, init=False, repr=False, compare=False)
+    _instruction_info: Any = field(default=_UNPARSED, init=False, repr=False, compare=False)
+
     @classmethod
     def parse(cls, data: Dict[str, Any]) -> "Event":
         """从 JSON 数据解析事件"""
@@ -125,31 +152,41 @@ class Event:
 
         当我们的 pipeline 正在处理时，需要拦截这些命令防止云端抢先播放。
         """
-        if self.event != "instruction" or not isinstance(self.data, dict):
+        inner = self._new_line_inner()
+        if inner is None:
             return False
 
-        new_line = self.data.get("NewLine")
-        if not new_line:
-            return False
-
-        try:
-            inner = json.loads(new_line)
-            header = inner.get("header", {})
-            ns = header.get("namespace", "")
-            name = header.get("name", "")
-            return (ns, name) in {
-                ("AudioPlayer", "Play"),
-                ("SpeechSynthesizer", "Speak"),
-            }
-        except (json.JSONDecodeError, TypeError, KeyError):
+        header = inner.get("header")
+        if not isinstance(header, dict):
             return False
+        return (header.get("namespace", ""), header.get("name", "")) in _CLOUD_PLAYBACK_HEADERS
+
+    def _new_line_inner(self) -> Optional[Dict[str, Any]]:
+        """instruction 事件 {"NewLine": "<escaped_json>"} 的内层 JSON（只解析一次）"""
+        if self._inner is _UNPARSED:
+            inner = None
+            if self.event == "instruction" and isinstance(self.data, dict):
+                new_line = self.data.get("NewLine")
+                if new_line:
+                    try:
+                        inner = orjson.loads(new_line)
+                    except (orjson.JSONDecodeError, TypeError):
+                        inner = None
+            self._inner = inner if isinstance(inner, dict) else None
+        return self._inner
 
     def _parse_instruction_payload(self) -> Optional[tuple]:
-        """解析 instruction 事件的 ASR payload
+        """解析 instruction 事件的 ASR payload（结果缓存）
 
         Returns:
             (text, is_final) 元组，或 None
         """
+        if self._instruction_info is _UNPARSED:
+            self._instruction_info = self._extract_instruction_payload()
+        return self._instruction_info
+
+    def _extract_instruction_payload(self) -> Optional[tuple]:
+        """从事件数据中提取 (text, is_final)"""
         if self.event != "instruction":
             return None
 
@@ -162,15 +199,17 @@ class Event:
 
         # open-xiaoai 格式: {"NewLine": "<escaped_json>"}
         if "NewLine" in self.data:
+            inner = self._new_line_inner()
+            if inner is None:
+                return None
             try:
-                inner = json.loads(self.data["NewLine"])
                 payload = inner.get("payload", {})
                 results = payload.get("results", [])
                 if results and isinstance(results, list) and len(results) > 0:
                     text = results[0].get("text")
                     is_final = payload.get("is_final", False) or results[0].get("is_stop", False)
                     return (text, is_final)
-            except (json.JSONDecodeError, TypeError, KeyError):
+            except (AttributeError, TypeError, KeyError):
                 return None
 
         # 兼容扁平格式
@@ -223,7 +262,7 @@ class Request:
 
     def __post_init__(self):
         if not self.id:
-            self.id = str(uuid.uuid4())
+            self.id = next_request_id()
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -233,14 +272,22 @@ class Request:
         return result
 
     def to_json(self) -> str:
-        """转换为 JSON 字符串 (open-xiaoai 包装格式)"""
-        return json.dumps({"Request": self.to_dict()}, ensure_ascii=False)
+        """转换为 JSON 字符串 (open-xiaoai 包装格式)
+
+        固定命令 (pause/play/abort_xiaoai 等) 的 command+payload 片段在导入时预序列化，
+        这里只需拼接 id。
+        """
+        if not isinstance(self.payload, dict):
+            body = _PRESERIALIZED.get((self.command, self.payload))
+            if body is not None:
+                return f'{{"Request":{{"id":{orjson.dumps(self.id).decode()},{body}}}}}'
+        return orjson.dumps({"Request": self.to_dict()}).decode()
 
     @classmethod
     def play_url(cls, url: str) -> "Request":
         """播放音频 URL (通过 ubus mediaplayer)"""
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="run_shell",
             payload=f'ubus call mediaplayer player_play_url \'{{"url":"{url}","type": 1}}\''
         )
@@ -250,7 +297,7 @@ class Request:
         """TTS 播放 (使用设备内置 tts_play.sh)"""
         safe_text = text.replace("'", "'\\''")
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="run_shell",
             payload=f"/usr/sbin/tts_play.sh '{safe_text}'"
         )
@@ -259,7 +306,7 @@ class Request:
     def play(cls) -> "Request":
         """继续播放 (mphelper play)"""
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="run_shell",
             payload="mphelper play"
         )
@@ -268,7 +315,7 @@ class Request:
     def pause(cls) -> "Request":
         """暂停播放 (mphelper pause)"""
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="run_shell",
             payload="mphelper pause"
         )
@@ -277,7 +324,7 @@ class Request:
     def get_play_status(cls) -> "Request":
         """获取播放状态 (mphelper mute_stat)"""
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="run_shell",
             payload="mphelper mute_stat"
         )
@@ -286,7 +333,7 @@ class Request:
     def mic_on(cls) -> "Request":
         """开启麦克风"""
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="run_shell",
             payload="ubus -t1 -S call pnshelper event_notify '{\"src\":3, \"event\":7}' 2>&1"
         )
@@ -295,7 +342,7 @@ class Request:
     def mic_off(cls) -> "Request":
         """关闭麦克风"""
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="run_shell",
             payload="ubus -t1 -S call pnshelper event_notify '{\"src\":3, \"event\":8}' 2>&1"
         )
@@ -312,7 +359,7 @@ class Request:
                 "ubus call pnshelper event_notify '{\"src\":3, \"event\":8}'"
             )
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="run_shell",
             payload=script
         )
@@ -321,7 +368,7 @@ class Request:
     def abort_xiaoai(cls) -> "Request":
         """中断原生小爱 (重启 mico_aivs_lab 服务)"""
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="run_shell",
             payload="/etc/init.d/mico_aivs_lab restart >/dev/null 2>&1"
         )
@@ -331,7 +378,7 @@ class Request:
         """发送文字给原生小爱 NLP"""
         safe_text = text.replace('"', '\\"')
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="run_shell",
             payload=f'ubus call mibrain ai_service \'{{"tts":1,"nlp":1,"nlp_text":"{safe_text}"}}\''
         )
@@ -340,7 +387,7 @@ class Request:
     def get_device_model(cls) -> "Request":
         """获取设备型号"""
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="run_shell",
             payload="echo $(micocfg_model)"
         )
@@ -349,7 +396,7 @@ class Request:
     def get_device_sn(cls) -> "Request":
         """获取设备序列号"""
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="run_shell",
             payload="echo $(micocfg_sn)"
         )
@@ -358,7 +405,7 @@ class Request:
     def run_shell(cls, script: str) -> "Request":
         """执行 shell 脚本 (payload 为纯字符串)"""
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="run_shell",
             payload=script
         )
@@ -368,7 +415,7 @@ class Request:
         """设置音量 (0-100)"""
         level = max(0, min(100, level))
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="run_shell",
             payload=f"ubus call player_command volume_ctrl '{{\"action\":\"set\",\"value\":{level}}}'"
         )
@@ -377,7 +424,7 @@ class Request:
     def volume_up(cls, step: int = 10) -> "Request":
         """音量增大"""
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="run_shell",
             payload=f"ubus call player_command volume_ctrl '{{\"action\":\"up\",\"value\":{step}}}'"
         )
@@ -386,7 +433,7 @@ class Request:
     def volume_down(cls, step: int = 10) -> "Request":
         """音量减小"""
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="run_shell",
             payload=f"ubus call player_command volume_ctrl '{{\"action\":\"down\",\"value\":{step}}}'"
         )
@@ -411,7 +458,7 @@ class Request:
         需要配合 abort_xiaoai() 阻止云端处理。
         """
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="start_recording",
             payload={
                 "pcm": pcm,
@@ -426,7 +473,7 @@ class Request:
     @classmethod
     def stop_recording(cls) -> "Request":
         """停止本地录音"""
-        return cls(id=str(uuid.uuid4()), command="stop_recording")
+        return cls(id=next_request_id(), command="stop_recording")
 
     @classmethod
     def start_play(
@@ -438,7 +485,7 @@ class Request:
     ) -> "Request":
         """启动本地播放（预留，暂不使用）"""
         return cls(
-            id=str(uuid.uuid4()),
+            id=next_request_id(),
             command="start_play",
             payload={
                 "pcm": pcm,
@@ -451,7 +498,7 @@ class Request:
     @classmethod
     def stop_play(cls) -> "Request":
         """停止本地播放"""
-        return cls(id=str(uuid.uuid4()), command="stop_play")
+        return cls(id=next_request_id(), command="stop_play")
 
 
 @dataclass
@@ -495,7 +542,7 @@ def parse_json_message(data: str) -> Optional[Event | Response]:
     也兼容扁平格式 (无包装)
     """
     try:
-        json_data = json.loads(data)
+        json_data = orjson.loads(data)
 
         # open-xiaoai 包装格式: {"Event": {...}}
         if "Event" in json_data:
@@ -512,7 +559,7 @@ def parse_json_message(data: str) -> Optional[Event | Response]:
             return Response.parse(json_data)
 
         return None
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         return None
 
 
@@ -528,9 +575,12 @@ def parse_binary_message(data: bytes) -> Optional[Stream]:
 
     如果解析失败，返回 None（调用方可回退为 raw PCM）。
     """
+    # Stream 包装必然以 '{' 开头；raw PCM 帧直接跳过整帧 JSON 解析
+    if data[:1] != b"{":
+        return None
     try:
-        json_data = json.loads(data)
-    except (json.JSONDecodeError, UnicodeDecodeError):
+        json_data = orjson.loads(data)
+    except orjson.JSONDecodeError:
         return None
 
     if not isinstance(json_data, dict):
@@ -560,3 +610,31 @@ def parse_binary_message(data: bytes) -> Optional[Stream]:
         data=pcm_data,
         metadata=json_data.get("data"),
     )
+
+
+def _preserialize(*requests: Request) -> Dict[tuple, str]:
+    """预序列化固定命令的 command+payload 片段 (不含 id)"""
+    table = {}
+    for req in requests:
+        body = {"command": req.command}
+        if req.payload is not None:
+            body["payload"] = req.payload
+        table[(req.command, req.payload)] = orjson.dumps(body).decode()[1:-1]
+    return table
+
+
+# (command, payload) → 预序列化片段
+_PRESERIALIZED: Dict[tuple, str] = _preserialize(
+    Request.play(),
+    Request.pause(),
+    Request.abort_xiaoai(),
+    Request.stop_recording(),
+    Request.stop_play(),
+    Request.get_play_status(),
+    Request.mic_on(),
+    Request.mic_off(),
+    Request.wake_up(silent=True),
+    Request.wake_up(),
+    Request.volume_up(),
+    Request.volume_down(),
+)
@@ -23,12 +23,12 @@ from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 if TYPE_CHECKING:
     from .redis_service import RedisService
 
-import httpx
 from pypinyin import lazy_pinyin
 
 from ..models.database import ArtistType, ContentType
 from .content_service import ContentService
 from .minio_service import MinIOService
+from ..utils.http import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -539,9 +539,8 @@ class DownloadService:
 
     async def _upload_thumbnail(self, url: str, file_key: str) -> str:
         """下载缩略图并上传到 MinIO"""
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
+        resp = await get_http_client().get(url)
+        resp.raise_for_status()
 
         ext = "jpg"
         ct = resp.headers.get("content-type", "")
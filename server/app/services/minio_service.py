@@ -77,7 +77,7 @@ class MinIOService:
         prefix 为空时设置整个 bucket 公开读取。
         幂等操作，已存在的策略不会重复添加。
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         await loop.run_in_executor(None, self._set_public_read_sync, prefix)
 
     def _set_public_read_sync(self, prefix: str = ""):
@@ -133,7 +133,7 @@ class MinIOService:
         Returns:
             对象名称
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         await loop.run_in_executor(
             None,
             self._upload_file_sync,
@@ -179,7 +179,7 @@ class MinIOService:
         Returns:
             对象名称
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         await loop.run_in_executor(
             None,
             self._upload_bytes_sync,
@@ -219,7 +219,7 @@ class MinIOService:
             object_name: 对象名称
             file_path: 本地保存路径
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         await loop.run_in_executor(
             None,
             self._download_file_sync,
@@ -243,7 +243,7 @@ class MinIOService:
         Returns:
             字节数据
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
             None,
             self._download_bytes_sync,
@@ -275,7 +275,7 @@ class MinIOService:
         Returns:
             预签名 URL
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
             None,
             self._get_presigned_url_sync,
@@ -312,7 +312,7 @@ class MinIOService:
         Returns:
             预签名上传 URL
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
             None,
             self._presigned_put_url_sync,
@@ -344,7 +344,7 @@ class MinIOService:
         Returns:
             是否存在
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
             None,
             self._exists_sync,
@@ -362,7 +362,7 @@ class MinIOService:
 
     async def get_metadata(self, object_name: str) -> Dict[str, str]:
         """获取对象自定义元数据 (键全部小写返回)"""
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
             None, self._get_metadata_sync, object_name
         )
@@ -383,7 +383,7 @@ class MinIOService:
         Args:
             object_name: 对象名称
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         await loop.run_in_executor(
             None,
             self._delete_sync,
@@ -411,7 +411,7 @@ class MinIOService:
         Returns:
             对象列表
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
             None,
             self._list_objects_sync,
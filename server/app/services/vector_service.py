@@ -9,6 +9,7 @@
 
 import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Tuple
 
 logger = logging.getLogger(__name__)
@@ -32,6 +33,9 @@ class VectorSearchService:
         self._collection = None
         self._model = None
         self._ready = False
+        # 专用单线程执行 embedding 推理：torch 内部已多线程，
+        # 放进默认线程池会与下载/MinIO 任务争抢 CPU
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
 
     def initialize(self) -> bool:
         """初始化 ChromaDB 客户端和 embedding 模型。
@@ -89,7 +93,7 @@ class VectorSearchService:
             return False
         try:
             loop = asyncio.get_running_loop()
-            vector = await loop.run_in_executor(None, self._encode, title)
+            vector = await loop.run_in_executor(self._executor, self._encode, title)
 
             self._collection.upsert(
                 ids=[str(content_id)],
@@ -128,7 +132,7 @@ class VectorSearchService:
                 return []
 
             loop = asyncio.get_running_loop()
-            query_vector = await loop.run_in_executor(None, self._encode, query)
+            query_vector = await loop.run_in_executor(self._executor, self._encode, query)
 
             where = {"content_type": content_type} if content_type else None
 
@@ -211,6 +215,10 @@ class VectorSearchService:
     def is_ready(self) -> bool:
         return self._ready
 
+    def close(self):
+        """关闭 embedding 线程（应用关闭时调用）"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
     def count(self) -> int:
         """返回向量库中的记录数"""
         if not self._ready:
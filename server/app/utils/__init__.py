@@ -8,7 +8,7 @@ import hashlib
 import time
 from typing import Optional
 
-from .audio import pcm_to_wav, get_audio_duration, get_wav_duration, convert_sample_rate
+from .audio import pcm_to_wav, get_audio_duration, get_wav_duration, convert_sample_rate, calculate_rms, calculate_peak
 from .logger import setup_logging, get_logger, StructuredFormatter
 
 
@@ -5,9 +5,10 @@ PCM/WAV 格式转换和音频信息获取
 """
 
 import io
-import struct
 import wave
 
+import numpy as np
+
 
 def pcm_to_wav(
     pcm_data: bytes,
@@ -60,6 +61,42 @@ def get_audio_duration(
     return len(data) / bytes_per_second
 
 
+def calculate_rms(pcm_data: bytes, stride: int = 1) -> float:
+    """
+    计算 16-bit PCM 的 RMS 能量 (numpy 向量化)
+
+    Args:
+        pcm_data: 16-bit 小端 PCM 数据，奇数尾字节忽略
+        stride: 采样步长，>1 时只取每 stride 个采样估算（用于 VAD 阈值判断）
+
+    Returns:
+        RMS 能量，数据不足一个采样时返回 0
+    """
+    count = len(pcm_data) // 2
+    if count == 0:
+        return 0.0
+    samples = np.frombuffer(pcm_data, dtype="<i2", count=count)[::stride].astype(np.float32)
+    return float(np.sqrt(np.dot(samples, samples) / samples.size))
+
+
+def calculate_peak(pcm_data: bytes) -> int:
+    """
+    计算 16-bit PCM 的峰值幅度 (numpy 向量化)
+
+    Args:
+        pcm_data: 16-bit 小端 PCM 数据，奇数尾字节忽略
+
+    Returns:
+        最大绝对采样值，数据不足一个采样时返回 0
+    """
+    count = len(pcm_data) // 2
+    if count == 0:
+        return 0
+    samples = np.frombuffer(pcm_data, dtype="<i2", count=count)
+    # 分别取 max/min，避免 abs(-32768) 在 int16 下溢出
+    return max(int(samples.max()), -int(samples.min()))
+
+
 def get_wav_duration(wav_data: bytes) -> float:
     """
     获取 WAV 文件时长
@@ -102,53 +139,32 @@ def convert_sample_rate(
     if from_rate == to_rate:
         return data
 
-    # 解析样本
-    fmt = "<h" if sample_width == 2 else "<b"
+    # 解析样本: (采样数, 声道数)
+    dtype = "<i2" if sample_width == 2 else "i1"
     sample_count = len(data) // (sample_width * channels)
 
     if sample_count == 0:
         return b""
 
-    samples = struct.unpack(f"<{sample_count * channels}{'h' if sample_width == 2 else 'b'}", data)
-
-    # 按声道分组
-    channel_data = []
-    for ch in range(channels):
-        channel_data.append(samples[ch::channels])
+    samples = np.frombuffer(data, dtype=dtype, count=sample_count * channels)
+    samples = samples.reshape(sample_count, channels).astype(np.float64)
 
-    # 对每个声道进行线性插值
+    # 线性插值 (numpy 向量化，直接按下标取相邻采样，无需 np.interp 二分查找)
     ratio = from_rate / to_rate
     new_sample_count = int(sample_count / ratio)
-    resampled_channels = []
-
-    for ch_samples in channel_data:
-        resampled = []
-        for i in range(new_sample_count):
-            src_pos = i * ratio
-            idx = int(src_pos)
-            frac = src_pos - idx
-
-            if idx + 1 < len(ch_samples):
-                value = ch_samples[idx] * (1 - frac) + ch_samples[idx + 1] * frac
-            elif idx < len(ch_samples):
-                value = ch_samples[idx]
-            else:
-                break
-
-            if sample_width == 2:
-                value = max(-32768, min(32767, int(value)))
-            else:
-                value = max(-128, min(127, int(value)))
-
-            resampled.append(value)
-        resampled_channels.append(resampled)
-
-    # 交错声道
-    result = []
-    for i in range(len(resampled_channels[0])):
-        for ch in range(channels):
-            if i < len(resampled_channels[ch]):
-                result.append(resampled_channels[ch][i])
-
-    pack_fmt = f"<{len(result)}{'h' if sample_width == 2 else 'b'}"
-    return struct.pack(pack_fmt, *result)
+    pos = np.arange(new_sample_count) * ratio
+    idx = pos.astype(np.int64)
+    keep = idx < sample_count
+    pos, idx = pos[keep], idx[keep]
+    frac = pos - idx
+    # 最后一个采样没有后继：直接取原值
+    last = idx + 1 >= sample_count
+    frac[last] = 0.0
+    nxt = np.minimum(idx + 1, sample_count - 1)
+
+    frac = frac[:, None]
+    values = samples[idx] * (1 - frac) + samples[nxt] * frac
+
+    info = np.iinfo(dtype)
+    # astype 向零截断，与 int() 一致；多声道按行展开即为交错顺序
+    return np.clip(values.astype(np.int64), info.min, info.max).astype(dtype).tobytes()
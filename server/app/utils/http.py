@@ -0,0 +1,40 @@
+"""
+共享 HTTP 客户端
+
+- HTTP_LIMITS: ai-manager 各服务 (ASR/TTS/LLM) 长连接池参数。
+  语音交互之间通常间隔数秒以上，httpx 默认 5s 的 keepalive 会导致每轮重新握手。
+- get_http_client(): 进程级通用客户端，用于下载 TTS 音频、封面等临时请求，
+  避免每次调用都新建连接池。
+"""
+
+from typing import Optional
+
+import httpx
+
+HTTP_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=60.0,
+)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """获取通用 HTTP 客户端 (懒加载)"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(15.0, connect=5.0),
+            limits=HTTP_LIMITS,
+            follow_redirects=True,
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """关闭通用 HTTP 客户端"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
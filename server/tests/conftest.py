@@ -11,6 +11,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from app.api.websocket import DeviceConnection, set_pipeline
+from app.config import AudioConfig
 
 
 @pytest.fixture
@@ -19,7 +20,8 @@ def conn():
     return DeviceConnection(
         device_id="test-device",
         websocket=MagicMock(),
-        audio_buffer=MagicMock(),  # 提供 mock 避免触发 __post_init__ 中的 get_settings
+        audio_buffer=MagicMock(),
+        audio_cfg=AudioConfig(),  # 显式注入，避免触发 __post_init__ 中的 get_settings
     )
 
 
@@ -28,6 +30,7 @@ def mock_manager():
     """Mock 全局 ConnectionManager，拦截所有 send_request 调用"""
     with patch("app.api.websocket.manager") as m:
         m.send_request = AsyncMock(return_value=None)
+        m.send_requests = AsyncMock(return_value=None)
         m.get_connection = MagicMock()
         yield m
 
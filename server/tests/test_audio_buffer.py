@@ -0,0 +1,279 @@
+"""
+AudioBuffer 录音缓冲测试
+
+覆盖场景:
+1. 追加数据后 stop 返回完整 PCM，时长按写入字节计算
+2. 超出环形缓冲容量时截断后续数据并判停
+3. stop 后缓冲区归还到池中，下次 start 复用
+4. 池中缓冲区小于所需容量时重新分配；start 换用更大缓冲时旧缓冲归还池中
+5. 环形缓冲回绕读写
+6. RMS 能量计算（含步长采样）与语音活动判定
+7. 开口前的静音帧丢弃，开口后的静音帧保留
+8. 持续语音检测：峰值未过阈值的帧不计算 RMS
+9. reset 清空状态但保留环形缓冲，之后可重新 start
+10. 语音帧计数：不足 min_voiced_frames 时 has_speech 为 False
+11. 采样率转换：线性插值与多声道交错
+"""
+
+import struct
+
+from app.core.asr import AudioBuffer, AudioBufferPool
+from app.core.ringbuffer import SPSCRingBuffer, next_pow2
+from app.utils.audio import calculate_peak, calculate_rms, convert_sample_rate
+
+
+# ── 1. 基本录音 ──────────────────────────────────────────
+
+
+def test_append_and_stop():
+    """append 的数据按顺序拼接返回"""
+    buf = AudioBuffer(max_duration=1.0)
+    buf.start()
+    buf.append(b"\x00\x01" * 100)
+    buf.append(b"\x02\x03" * 50)
+
+    assert buf.get_duration() == 300 / (16000 * 2)
+    assert buf.stop() == b"\x00\x01" * 100 + b"\x02\x03" * 50
+
+
+# ── 2. 容量溢出 ──────────────────────────────────────────
+
+
+def test_append_beyond_capacity():
+    """写入超过容量（20 字节向上取整为 32）→ 保留开头，截断后续数据，should_stop 立即判停"""
+    buf = AudioBuffer(sample_rate=100, max_duration=0.1)
+    buf.start()
+    buf.append(b"a" * 16)
+    buf.append(b"b" * 16)
+    assert not buf.should_stop()
+
+    buf.append(b"c" * 8)
+    assert buf.should_stop()
+    assert buf.stop() == b"a" * 16 + b"b" * 16
+
+    buf.start()
+    assert not buf.should_stop()
+    buf.stop()
+
+
+# ── 3. 池复用 ────────────────────────────────────────────
+
+
+def test_pool_reuse(monkeypatch):
+    """stop 归还缓冲区，下一次 start 取回同一对象"""
+    pool = AudioBufferPool(max_size=2)
+    monkeypatch.setattr("app.core.asr._buffer_pool", pool)
+
+    first = AudioBuffer(max_duration=1.0)
+    first.start()
+    backing = first._ring.buf
+    first.append(b"\x01\x02")
+    first.stop()
+
+    second = AudioBuffer(max_duration=1.0)
+    second.start()
+    assert second._ring.buf is backing
+    # 复用的缓冲区不应泄漏上一段录音
+    assert second.stop() == b""
+
+
+# ── 4. 容量不足 ──────────────────────────────────────────
+
+
+def test_pool_acquire_too_small():
+    """池中缓冲区不够大 → 分配新的"""
+    pool = AudioBufferPool()
+    pool.release(bytearray(10))
+
+    buf = pool.acquire(100)
+    assert len(buf) == 100
+
+
+def test_start_releases_smaller_ring(monkeypatch):
+    """max_duration 调大后 start → 旧的小缓冲归还池中，而不是被丢弃"""
+    pool = AudioBufferPool()
+    monkeypatch.setattr("app.core.asr._buffer_pool", pool)
+
+    buf = AudioBuffer(sample_rate=100, max_duration=0.1)
+    buf.start()
+    small = buf._ring.buf
+
+    buf.max_duration = 1.0
+    buf.start()
+
+    assert buf._ring.buf is not small
+    assert pool._pool[-1] is small
+
+
+# ── 5. 环形缓冲 ──────────────────────────────────────────
+
+
+def test_next_pow2():
+    assert next_pow2(1) == 1
+    assert next_pow2(20) == 32
+    assert next_pow2(32) == 32
+
+
+def test_ring_wraparound():
+    """读出后继续写入跨越尾部 → 按写入顺序读回"""
+    ring = SPSCRingBuffer(8)
+    ring.write(b"123456")
+    assert ring.read_all() == b"123456"
+
+    ring.write(b"abcdef")  # 跨越下标 8 回绕
+    assert len(ring) == 6
+    assert ring.read_all() == b"abcdef"
+
+
+def test_ring_oversized_write():
+    """写入超过剩余空间 → 只写入能容纳的前段，返回 False，不覆盖未读数据"""
+    ring = SPSCRingBuffer(4)
+    assert ring.write(b"ab")
+    assert not ring.write(b"cdefgh")
+    assert ring.read_all() == b"abcd"
+    assert ring.write(b"wxyz")
+
+
+# ── 6. 能量检测 ──────────────────────────────────────────
+
+
+def test_calculate_rms():
+    """与逐采样计算结果一致，空数据返回 0"""
+    samples = [1000, -1000, 3000, -3000]
+    pcm = struct.pack("<4h", *samples)
+    expected = (sum(s * s for s in samples) / len(samples)) ** 0.5
+
+    assert abs(calculate_rms(pcm) - expected) < 1e-3
+    assert calculate_rms(b"") == 0.0
+    assert calculate_rms(b"\x01") == 0.0
+
+
+def test_calculate_rms_stride():
+    """stride > 1 时只用每 stride 个采样计算"""
+    pcm = struct.pack("<8h", 1000, 0, 1000, 0, 1000, 0, 1000, 0)
+
+    assert abs(calculate_rms(pcm, 2) - 1000) < 1e-3
+    assert abs(calculate_rms(pcm, 100) - 1000) < 1e-3
+
+
+def test_voice_activity_threshold():
+    """能量高于阈值才算语音"""
+    buf = AudioBuffer(energy_threshold=500)
+    loud = struct.pack("<4h", 2000, -2000, 2000, -2000)
+    quiet = struct.pack("<4h", 10, -10, 10, -10)
+
+    assert buf._has_voice_activity(loud)
+    assert not buf._has_voice_activity(quiet)
+
+
+def test_calculate_peak():
+    """-32768 不溢出"""
+    assert calculate_peak(struct.pack("<3h", 5, -32768, 100)) == 32768
+    assert calculate_peak(b"") == 0
+
+
+# ── 7. 静音帧丢弃 ────────────────────────────────────────
+
+
+def test_leading_silence_dropped():
+    """语音前的静音帧不写入，语音后的静音帧（判停窗口）保留"""
+    silence = struct.pack("<4h", 3, -3, 3, -3)
+    speech = struct.pack("<4h", 2000, -2000, 2000, -2000)
+
+    buf = AudioBuffer(max_duration=1.0)
+    buf.start()
+    buf.append(silence)
+    buf.append(silence)
+    buf.append(speech)
+    buf.append(silence)
+
+    assert buf.stop() == speech + silence
+
+
+# ── 8. 持续语音检测 ──────────────────────────────────────
+
+
+def test_sustained_speech_peak_reject(monkeypatch):
+    """峰值低于能量阈值 → 直接判为静音，不调用 calculate_rms"""
+    def fail(*_):
+        raise AssertionError("calculate_rms should not be called")
+
+    monkeypatch.setattr("app.core.asr.calculate_rms", fail)
+    buf = AudioBuffer(energy_threshold=500)
+    buf._consecutive_voice_active = True
+
+    assert not buf.has_sustained_speech(struct.pack("<4h", 400, -400, 300, -300))
+    assert not buf._consecutive_voice_active
+
+
+def test_sustained_speech_requires_duration():
+    """能量持续超标达到 min_duration_ms 才返回 True"""
+    buf = AudioBuffer(energy_threshold=500)
+    speech = struct.pack("<4h", 2000, -2000, 2000, -2000)
+
+    assert not buf.has_sustained_speech(speech, min_duration_ms=0)
+    assert buf.has_sustained_speech(speech, min_duration_ms=0)
+
+
+# ── 9. 复用 ──────────────────────────────────────────────
+
+
+def test_reset_keeps_ring():
+    """reset → 停止录音、清空数据，同一环形缓冲在下次 start 复用"""
+    buf = AudioBuffer(max_duration=1.0, energy_threshold=500)
+    speech = struct.pack("<4h", 2000, -2000, 2000, -2000)
+    buf.start()
+    buf.append(speech)
+    ring = buf._ring
+
+    buf.reset()
+    assert not buf.is_recording
+    assert buf.get_duration() == 0
+    assert not buf._consecutive_voice_active
+
+    buf.start()
+    assert buf._ring is ring
+    buf.append(speech)
+    assert buf.stop() == speech
+
+
+# ── 10. 语音帧计数 ───────────────────────────────────────
+
+
+def test_has_speech_counts_voiced_frames():
+    """语音帧达到 min_voiced_frames 才算有语音，start 重新计数"""
+    buf = AudioBuffer(max_duration=1.0, energy_threshold=500, min_voiced_frames=2)
+    speech = struct.pack("<4h", 2000, -2000, 2000, -2000)
+    noise = struct.pack("<4h", 300, -300, 300, -300)
+
+    buf.start()
+    buf.append(noise)
+    buf.append(speech)
+    assert not buf.has_speech
+    buf.append(speech)
+    assert buf.has_speech
+
+    buf.stop()
+    buf.start()
+    assert not buf.has_speech
+
+
+# ── 11. 采样率转换 ───────────────────────────────────────
+
+
+def test_convert_sample_rate_linear():
+    """上采样按线性插值，末尾采样无后继时取原值；同采样率原样返回"""
+    pcm = struct.pack("<3h", 0, 1000, -1000)
+
+    assert convert_sample_rate(pcm, 8000, 16000) == struct.pack("<6h", 0, 500, 1000, 0, -1000, -1000)
+    assert convert_sample_rate(pcm, 16000, 16000) is pcm
+    assert convert_sample_rate(b"", 8000, 16000) == b""
+
+
+def test_convert_sample_rate_stereo():
+    """多声道分别插值后保持交错顺序"""
+    pcm = struct.pack("<4h", 0, 100, 1000, -100)
+
+    assert convert_sample_rate(pcm, 8000, 16000, channels=2) == struct.pack(
+        "<8h", 0, 100, 500, 0, 1000, -100, 1000, -100
+    )
@@ -0,0 +1,246 @@
+"""
+ConnectionManager 请求/响应测试
+
+覆盖场景:
+1. wait_response=True 收到响应后返回，pending_requests 被清理
+2. 超时返回 None，pending_requests 被清理
+3. 广播并发发送同一条消息，单个连接失败不影响其他
+4. 端点接收循环按帧类型分发文本/二进制消息，断开后清理连接
+5. 同一设备重连：新连接替换旧连接，旧连接后台关闭；旧连接断开不影响新连接
+6. 成组发送按顺序逐帧写出，设备未连接时直接返回
+7. 设备 ID 同一进程内共享前缀且不重复
+8. 传入已持有的连接时直接发送，不按 device_id 查找
+9. cancel_pending 一次取消并清空多个 Task / TimerHandle
+10. 响应在 send_text 让出期间到达也能匹配；发送失败清理 pending_requests
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.websocket import (
+    ConnectionManager, DeviceConnection, _new_device_id, handle_response, router,
+)
+from app.config import AudioConfig
+from app.models.protocol import Request, Response
+
+
+# ── Fixtures ─────────────────────────────────────────────
+
+
+@pytest.fixture
+def manager(conn):
+    m = ConnectionManager()
+    conn.websocket.send_text = AsyncMock()
+    m.connections[conn.device_id] = conn
+    return m
+
+
+# ── 1. 正常响应 ──────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_send_request_receives_response(manager, conn):
+    """设备回复后 send_request 返回该响应"""
+    request = Request.pause()
+    task = asyncio.create_task(
+        manager.send_request(conn.device_id, request, wait_response=True, timeout=1.0)
+    )
+    await asyncio.sleep(0)
+
+    await handle_response(conn, Response(id=request.id, code=0))
+    response = await task
+
+    assert response is not None and response.is_success()
+    assert conn.pending_requests == {}
+
+
+# ── 2. 超时 ──────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_send_request_timeout(manager, conn):
+    """无响应 → 超时返回 None"""
+    response = await manager.send_request(
+        conn.device_id, Request.pause(), wait_response=True, timeout=0.01
+    )
+
+    assert response is None
+    assert conn.pending_requests == {}
+
+
+# ── 3. 广播 ──────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_broadcast_isolates_failures(manager, conn):
+    """一台设备发送异常 → 其余设备照常收到同一条消息"""
+    broken = DeviceConnection(
+        device_id="broken", websocket=MagicMock(),
+        audio_buffer=MagicMock(), audio_cfg=AudioConfig(),
+    )
+    broken.websocket.send_text = AsyncMock(side_effect=RuntimeError("closed"))
+    manager.connections["broken"] = broken
+
+    request = Request.pause()
+    await manager.broadcast(request)
+
+    conn.websocket.send_text.assert_awaited_once()
+    sent = conn.websocket.send_text.call_args.args[0]
+    assert broken.websocket.send_text.call_args.args[0] == sent
+
+
+# ── 4. 接收循环 ──────────────────────────────────────────
+
+
+def test_endpoint_dispatches_frames():
+    """文本帧 → handle_text_message，二进制帧 → handle_binary_message"""
+    app = FastAPI()
+    app.include_router(router)
+    local_manager = ConnectionManager()
+
+    with patch("app.api.websocket.manager", local_manager), \
+         patch("app.api.websocket.get_audio_config", return_value=AudioConfig()), \
+         patch("app.api.websocket.handle_text_message", new_callable=AsyncMock) as on_text, \
+         patch("app.api.websocket.handle_binary_message", new_callable=AsyncMock) as on_binary:
+        with TestClient(app).websocket_connect("/") as ws:
+            ws.send_bytes(b"\x01\x02")
+            ws.send_text('{"Event": {"id": "e1", "event": "kws"}}')
+            ws.send_bytes(b"\x03\x04")
+
+    assert [c.args[1] for c in on_binary.call_args_list] == [b"\x01\x02", b"\x03\x04"]
+    on_text.assert_awaited_once()
+    assert local_manager.connections == {}
+
+
+# ── 5. 重连替换 ──────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_reconnect_replaces_old_connection():
+    """重连 → 旧 websocket 被关闭；旧连接随后的 disconnect 不移除新连接"""
+    m = ConnectionManager()
+    old_ws, new_ws = MagicMock(), MagicMock()
+    for ws in (old_ws, new_ws):
+        ws.accept = AsyncMock()
+        ws.close = AsyncMock()
+
+    with patch("app.api.websocket.get_audio_config", return_value=AudioConfig()):
+        old = await m.connect(old_ws, "dev")
+        new = await m.connect(new_ws, "dev")
+    await asyncio.sleep(0)
+
+    old_ws.close.assert_awaited_once()
+    assert m.get_connection("dev") is new
+
+    await m.disconnect("dev", old)
+    assert m.get_connection("dev") is new
+
+    await m.disconnect("dev", new)
+    assert m.get_connection("dev") is None
+
+
+# ── 6. 成组发送 ──────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_send_requests_in_order(manager, conn):
+    """abort + pause → 两个独立文本帧，顺序不变"""
+    requests = [Request.abort_xiaoai(), Request.pause()]
+    await manager.send_requests(conn.device_id, requests)
+
+    sent = [c.args[0] for c in conn.websocket.send_text.call_args_list]
+    assert sent == [r.to_json() for r in requests]
+
+
+@pytest.mark.asyncio
+async def test_send_requests_unknown_device(manager, conn):
+    """设备未连接 → 不发送"""
+    await manager.send_requests("missing", [Request.pause()])
+    conn.websocket.send_text.assert_not_called()
+
+
+# ── 7. 设备 ID ───────────────────────────────────────────
+
+
+def test_new_device_id_unique():
+    """前缀相同、序号递增"""
+    ids = [_new_device_id() for _ in range(100)]
+
+    assert len(set(ids)) == 100
+    assert len({i.split("-")[0] for i in ids}) == 1
+
+
+# ── 8. 直接传入连接 ──────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_send_request_with_conn_skips_lookup(conn):
+    """conn 参数 → 不查 connections，直接在该连接上发送"""
+    m = ConnectionManager()
+    conn.websocket.send_text = AsyncMock()
+
+    with patch.object(m, "get_connection") as get_connection:
+        await m.send_request(conn.device_id, Request.pause(), conn=conn)
+        await m.send_requests(conn.device_id, [Request.abort_xiaoai(), Request.pause()], conn=conn)
+
+    get_connection.assert_not_called()
+    assert conn.websocket.send_text.await_count == 3
+
+
+# ── 9. cancel_pending ────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_cancel_pending(conn):
+    """运行中的 Task、未触发的 TimerHandle 被取消；None 与已完成的 Task 安全跳过"""
+    loop = asyncio.get_running_loop()
+    conn._auto_play_task = asyncio.create_task(asyncio.sleep(10))
+    conn._timeout_handle = loop.call_later(10, lambda: None)
+    conn._pipeline_worker = asyncio.create_task(asyncio.sleep(0))
+    await asyncio.sleep(0.01)
+    auto_play, timeout = conn._auto_play_task, conn._timeout_handle
+
+    conn.cancel_pending("_auto_play_task", "_timeout_handle", "_pipeline_worker", "_instruction_timer")
+    await asyncio.sleep(0)
+
+    assert auto_play.cancelled() and timeout.cancelled()
+    assert conn._auto_play_task is None
+    assert conn._timeout_handle is None
+    assert conn._pipeline_worker is None
+
+
+# ── 10. 发送期间到达的响应 ───────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_response_during_send(manager, conn):
+    """future 在发送前登记 → send_text 期间到达的响应不会丢失"""
+    request = Request.pause()
+
+    async def reply(_message):
+        await handle_response(conn, Response(id=request.id, code=0))
+
+    conn.websocket.send_text = AsyncMock(side_effect=reply)
+    response = await manager.send_request(
+        conn.device_id, request, wait_response=True, timeout=0.1
+    )
+
+    assert response is not None and response.is_success()
+    assert conn.pending_requests == {}
+
+
+@pytest.mark.asyncio
+async def test_send_failure_clears_pending(manager, conn):
+    """send_text 异常 → 返回 None，登记的 future 被清理"""
+    conn.websocket.send_text = AsyncMock(side_effect=RuntimeError("closed"))
+    response = await manager.send_request(
+        conn.device_id, Request.pause(), wait_response=True, timeout=0.1
+    )
+
+    assert response is None
+    assert conn.pending_requests == {}
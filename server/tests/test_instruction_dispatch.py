@@ -4,7 +4,8 @@ WebSocket 指令分发逻辑单元测试
 覆盖场景:
 1. non-final 事件重置 _instruction_dispatched
 2. final 事件正常 dispatch
-3. 同一轮重复 final 被阻止
+3. 同一轮重复 final 被阻止；合并窗口内的修正 final 只覆盖文本；
+   窗口内开始新一轮时上一轮立即处理，两条命令各处理一次；唤醒词取消合并窗口
 4. 连续命令（A → B，无唤醒词）都能 dispatch
 5. 纯 timer 路径（无 final，1.5s 后触发）
 6. _pipeline_active 在 await 之前设置
@@ -27,9 +28,11 @@ from unittest.mock import AsyncMock, MagicMock, patch, call
 
 from app.models.protocol import Event, PlayingState, ListeningState, Request
 from app.api.websocket import (
+    FINAL_COALESCE_WINDOW,
     handle_event,
     _auto_play_next,
     _on_instruction_complete,
+    _start_listening_session_initial,
     set_pipeline,
 )
 
@@ -91,6 +94,21 @@ async def drain():
     await asyncio.sleep(0.05)
 
 
+async def expire_final_window():
+    """等待 final 合并窗口到期，再让其创建的处理 task 执行完"""
+    await asyncio.sleep(FINAL_COALESCE_WINDOW)
+    await drain()
+
+
+def assert_abort_and_pause_sent(mock_manager):
+    """最近一次 send_requests 依次发送了 abort_xiaoai + pause"""
+    _, requests = mock_manager.send_requests.call_args.args
+    assert [r.payload for r in requests] == [
+        Request.abort_xiaoai().payload,
+        Request.pause().payload,
+    ]
+
+
 # ── 1. _instruction_dispatched 重置逻辑 ──────────────────
 
 
@@ -116,7 +134,7 @@ async def test_nonfinal_starts_debounce_timer(conn, mock_manager, mock_pipeline)
     await handle_event(conn, make_instruction_event("播放音乐", is_final=False))
 
     assert conn._instruction_timer is not None
-    assert not conn._instruction_timer.done()
+    assert not conn._instruction_timer.cancelled()
 
     conn._instruction_timer.cancel()
 
@@ -133,7 +151,7 @@ async def test_final_dispatches_pipeline(conn, mock_manager, mock_pipeline):
     assert conn._instruction_dispatched is True
 
     # 等待 _on_instruction_complete 执行完
-    await drain()
+    await expire_final_window()
 
     mock_pipeline.process_text.assert_called_once_with(
         "上一首", "test-device", conn
@@ -149,10 +167,10 @@ async def test_final_cancels_timer(conn, mock_manager, mock_pipeline):
 
     await handle_event(conn, make_instruction_event("暂停", is_stop=True))
 
-    # cancel() 是异步的，需要 drain 让 CancelledError 传播
-    await drain()
+    assert timer.cancelled()
+    assert conn._instruction_timer is None
 
-    assert timer.cancelled() or timer.done()
+    await expire_final_window()
 
 
 @pytest.mark.asyncio
@@ -181,7 +199,7 @@ async def test_final_sets_pipeline_active_before_await(conn, mock_manager, mock_
         f"got sequence: {pipeline_active_during_send}"
     )
 
-    await drain()
+    await expire_final_window()
 
 
 # ── 3. 重复 final 阻止 ──────────────────────────────────
@@ -194,17 +212,90 @@ async def test_duplicate_final_blocked(conn, mock_manager, mock_pipeline):
     await handle_event(conn, make_instruction_event("上一首", is_final=False))
     await handle_event(conn, make_instruction_event("上一首", is_stop=True))
 
-    await drain()
+    await expire_final_window()
     assert mock_pipeline.process_text.call_count == 1
 
     # 同一轮再来一个 is_final=true（中间无 non-final）
     await handle_event(conn, make_instruction_event("上一首", is_final=True))
 
-    await drain()
+    await expire_final_window()
     # 仍然只处理了一次
     assert mock_pipeline.process_text.call_count == 1
 
 
+@pytest.mark.asyncio
+async def test_final_correction_coalesced(conn, mock_manager, mock_pipeline):
+    """合并窗口内到达的修正 final 只覆盖文本并重新计时，pipeline 按最新文本处理一次"""
+    await handle_event(conn, make_instruction_event("播放", is_final=False))
+    await handle_event(conn, make_instruction_event("播放", is_final=True))
+    first = conn._final_coalesce_handle
+    assert first is not None
+
+    await handle_event(conn, make_instruction_event("播放儿歌", is_final=True))
+
+    # 窗口被重新计时：旧句柄取消，连接上只保留一个句柄
+    assert first.cancelled()
+    assert conn._final_coalesce_handle is not first
+    assert not mock_pipeline.process_text.called
+
+    await expire_final_window()
+
+    mock_pipeline.process_text.assert_called_once_with("播放儿歌", "test-device", conn)
+    assert conn._final_coalesce_handle is None
+
+
+@pytest.mark.asyncio
+async def test_new_round_inside_window_flushes_previous(conn, mock_manager, mock_pipeline):
+    """final A → non-final B → final B 都在合并窗口内：A、B 各处理一次，处理期间 _pipeline_active 保持 True"""
+    release = asyncio.Event()
+    active_during = []
+
+    async def slow_process_text(text, device_id, c):
+        await release.wait()
+        active_during.append(c._pipeline_active)
+
+    mock_pipeline.process_text = AsyncMock(side_effect=slow_process_text)
+
+    await handle_event(conn, make_instruction_event("暂停", is_final=True))
+    await handle_event(conn, make_instruction_event("下一", is_final=False))
+    # 新一轮开始时上一轮立即处理，不等窗口
+    assert conn._final_coalesce_handle is None
+    await handle_event(conn, make_instruction_event("下一首", is_final=True))
+
+    await expire_final_window()
+
+    texts = [c.args[0] for c in mock_pipeline.process_text.call_args_list]
+    assert texts == ["暂停", "下一首"]
+    # A 的 pipeline 仍在运行，不得被任何一轮提前清掉标记
+    assert conn._pipeline_active is True
+
+    release.set()
+    await drain()
+
+    assert mock_pipeline.process_text.call_count == 2
+    assert active_during == [True, True]
+    assert conn._pipeline_active is False
+    conn.cancel_pending("_instruction_timer")
+
+
+@pytest.mark.asyncio
+async def test_wake_word_cancels_final_window(conn, mock_manager, mock_pipeline):
+    """合并窗口内唤醒词介入 → 窗口取消，final 不再处理，_pipeline_active 撤销"""
+    await handle_event(conn, make_instruction_event("暂停", is_final=True))
+    handle = conn._final_coalesce_handle
+    assert conn._pipeline_active is True
+
+    await _start_listening_session_initial(conn)
+
+    assert handle.cancelled()
+    assert conn._final_coalesce_handle is None
+    assert conn._pipeline_active is False
+
+    await expire_final_window()
+    mock_pipeline.process_text.assert_not_called()
+    conn.cancel_pending("_timeout_handle")
+
+
 # ── 4. 连续命令（无唤醒词）──────────────────────────────
 
 
@@ -214,7 +305,7 @@ async def test_back_to_back_commands_both_dispatch(conn, mock_manager, mock_pipe
     # Command A
     await handle_event(conn, make_instruction_event("播放音乐", is_final=False))
     await handle_event(conn, make_instruction_event("播放音乐", is_stop=True))
-    await drain()
+    await expire_final_window()
 
     assert mock_pipeline.process_text.call_count == 1
     assert conn._pipeline_active is False  # A 处理完毕
@@ -224,7 +315,7 @@ async def test_back_to_back_commands_both_dispatch(conn, mock_manager, mock_pipe
     assert conn._instruction_dispatched is False
 
     await handle_event(conn, make_instruction_event("下一首", is_stop=True))
-    await drain()
+    await expire_final_window()
 
     assert mock_pipeline.process_text.call_count == 2
     mock_pipeline.process_text.assert_called_with("下一首", "test-device", conn)
@@ -238,7 +329,7 @@ async def test_three_consecutive_commands(conn, mock_manager, mock_pipeline):
     for cmd in commands:
         await handle_event(conn, make_instruction_event(cmd, is_final=False))
         await handle_event(conn, make_instruction_event(cmd, is_stop=True))
-        await drain()
+        await expire_final_window()
 
     assert mock_pipeline.process_text.call_count == 3
 
@@ -261,6 +352,20 @@ async def test_timer_fires_without_final(conn, mock_manager, mock_pipeline):
     mock_pipeline.process_text.assert_called_once_with("暂停", "test-device", conn)
 
 
+@pytest.mark.asyncio
+async def test_nonfinal_rearms_single_timer(conn, mock_manager, mock_pipeline):
+    """连续 non-final 事件只保留最新的定时器句柄，旧句柄被取消"""
+    await handle_event(conn, make_instruction_event("播放", is_final=False))
+    first = conn._instruction_timer
+    await handle_event(conn, make_instruction_event("播放音乐", is_final=False))
+
+    assert first.cancelled()
+    assert conn._instruction_timer is not first
+    assert not conn._instruction_timer.cancelled()
+
+    conn._instruction_timer.cancel()
+
+
 @pytest.mark.asyncio
 async def test_timer_blocked_if_final_already_dispatched(conn, mock_manager, mock_pipeline):
     """如果 final 已 dispatch，timer 应跳过（不重复处理）"""
@@ -269,7 +374,7 @@ async def test_timer_blocked_if_final_already_dispatched(conn, mock_manager, moc
     # final 立即 dispatch
     await handle_event(conn, make_instruction_event("上一首", is_stop=True))
 
-    await drain()
+    await expire_final_window()
     assert mock_pipeline.process_text.call_count == 1
 
     # 等 timer 到期（即使它没被 cancel 也应被 guard 阻止）
@@ -353,6 +458,27 @@ async def test_idle_triggers_autoplay_when_conditions_met(conn, mock_manager, mo
         pass
 
 
+@pytest.mark.asyncio
+async def test_repeated_idle_keeps_pending_autoplay(conn, mock_manager, mock_pipeline):
+    """防抖期间重复的 Idle 事件不应重建 _auto_play_next task"""
+    conn._queue_active = True
+    conn._pipeline_active = False
+
+    await handle_event(conn, make_playing_event("Idle"))
+    first = conn._auto_play_task
+    await handle_event(conn, make_playing_event("Playing"))
+    await handle_event(conn, make_playing_event("Idle"))
+
+    assert conn._auto_play_task is first
+    assert not first.cancelled()
+
+    first.cancel()
+    try:
+        await first
+    except asyncio.CancelledError:
+        pass
+
+
 @pytest.mark.asyncio
 async def test_auto_play_next_respects_pipeline_active(conn, mock_manager, mock_pipeline):
     """_auto_play_next 在 1.5s sleep 后应检查 _pipeline_active"""
@@ -424,10 +550,9 @@ async def test_on_instruction_complete_empty_text_resets_pipeline(
     conn, mock_manager, mock_pipeline
 ):
     """text 为空时，_on_instruction_complete 应重置 _pipeline_active 并退出"""
-    conn._instruction_text = ""
     conn._pipeline_active = True  # dispatch 路径提前设置
 
-    await _on_instruction_complete(conn)
+    await _on_instruction_complete(conn, "", conn._instruction_round)
 
     assert conn._pipeline_active is False
     mock_pipeline.process_text.assert_not_called()
@@ -438,10 +563,9 @@ async def test_on_instruction_complete_none_text_resets_pipeline(
     conn, mock_manager, mock_pipeline
 ):
     """text 为 None 时同样重置"""
-    conn._instruction_text = None
     conn._pipeline_active = True
 
-    await _on_instruction_complete(conn)
+    await _on_instruction_complete(conn, None, conn._instruction_round)
 
     assert conn._pipeline_active is False
 
@@ -451,10 +575,9 @@ async def test_on_instruction_complete_resets_pipeline_active_on_finish(
     conn, mock_manager, mock_pipeline
 ):
     """正常处理完毕后 _pipeline_active 应重置为 False"""
-    conn._instruction_text = "下一首"
     conn._pipeline_active = False
 
-    await _on_instruction_complete(conn)
+    await _on_instruction_complete(conn, "下一首", conn._instruction_round)
 
     assert conn._pipeline_active is False
     mock_pipeline.process_text.assert_called_once()
@@ -465,10 +588,9 @@ async def test_on_instruction_complete_resets_pipeline_active_on_error(
     conn, mock_manager, mock_pipeline
 ):
     """pipeline 异常时 _pipeline_active 仍应重置"""
-    conn._instruction_text = "出错测试"
     mock_pipeline.process_text = AsyncMock(side_effect=RuntimeError("模拟异常"))
 
-    await _on_instruction_complete(conn)
+    await _on_instruction_complete(conn, "出错测试", conn._instruction_round)
 
     assert conn._pipeline_active is False
 
@@ -504,7 +626,7 @@ async def test_instruction_processed_in_idle_state(conn, mock_manager, mock_pipe
 
     assert conn._instruction_dispatched is True
 
-    await drain()
+    await expire_final_window()
     mock_pipeline.process_text.assert_called_once()
 
 
@@ -519,7 +641,7 @@ async def test_cloud_playback_intercepted_during_pipeline(conn, mock_manager, mo
     await handle_event(conn, make_cloud_play_event())
 
     # 应发送 abort + pause 拦截云端
-    assert mock_manager.send_request.call_count == 2
+    assert_abort_and_pause_sent(mock_manager)
 
 
 @pytest.mark.asyncio
@@ -544,7 +666,7 @@ async def test_playing_intercepted_during_pipeline(conn, mock_manager, mock_pipe
     await handle_event(conn, make_playing_event("Playing"))
 
     # 应发送 abort + pause 打断云端播放
-    assert mock_manager.send_request.call_count == 2
+    assert_abort_and_pause_sent(mock_manager)
 
 
 @pytest.mark.asyncio
@@ -587,22 +709,23 @@ async def test_full_scenario_previous_track(conn, mock_manager, mock_pipeline):
     assert conn._pipeline_active is True
 
     # Step 3: duplicate final (is_final=True) — 应被阻止
-    initial_send_count = mock_manager.send_request.call_count
+    initial_send_count = mock_manager.send_requests.call_count
     await handle_event(conn, make_instruction_event("上一首", is_final=True))
-    # send_request 调用次数不应增加（duplicate 被忽略）
-    assert mock_manager.send_request.call_count == initial_send_count
+    # send_requests 调用次数不应增加（duplicate 被忽略）
+    assert mock_manager.send_requests.call_count == initial_send_count
 
     # Step 4: cloud PlaybackController/Prev — pipeline 活跃，应被拦截
     await handle_event(conn, make_cloud_play_event())
-    # 拦截应发送 2 个请求（abort + pause）
-    assert mock_manager.send_request.call_count == initial_send_count + 2
+    # 拦截应成组发送 abort + pause
+    assert mock_manager.send_requests.call_count == initial_send_count + 1
+    assert_abort_and_pause_sent(mock_manager)
 
     # Step 5: Idle — pipeline 活跃，不触发 auto_play
     await handle_event(conn, make_playing_event("Idle"))
     assert conn._auto_play_task is None
 
     # 等 pipeline 完成
-    await drain()
+    await expire_final_window()
     mock_pipeline.process_text.assert_called_once_with("上一首", "test-device", conn)
     assert conn._pipeline_active is False
 
@@ -615,7 +738,7 @@ async def test_full_scenario_consecutive_next_previous(conn, mock_manager, mock_
     # "下一首"
     await handle_event(conn, make_instruction_event("下一首", is_final=False))
     await handle_event(conn, make_instruction_event("下一首", is_stop=True))
-    await drain()
+    await expire_final_window()
 
     assert mock_pipeline.process_text.call_count == 1
     mock_pipeline.process_text.assert_called_with("下一首", "test-device", conn)
@@ -626,7 +749,7 @@ async def test_full_scenario_consecutive_next_previous(conn, mock_manager, mock_
     assert conn._instruction_dispatched is False  # 被 non-final 重置
 
     await handle_event(conn, make_instruction_event("上一首", is_stop=True))
-    await drain()
+    await expire_final_window()
 
     assert mock_pipeline.process_text.call_count == 2
     mock_pipeline.process_text.assert_called_with("上一首", "test-device", conn)
@@ -712,6 +835,6 @@ async def test_full_scenario_auto_play_race_with_previous(conn, mock_manager, mo
 
     # 步骤 5：final "上一首" 正常 dispatch
     await handle_event(conn, make_instruction_event("上一首", is_stop=True))
-    await drain()
+    await expire_final_window()
 
     mock_pipeline.process_text.assert_called_once_with("上一首", "test-device", conn)
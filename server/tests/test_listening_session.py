@@ -0,0 +1,172 @@
+"""
+监听会话超时测试
+
+覆盖场景:
+1. 唤醒后未收到音频 → 唤醒超时回到 IDLE 并 stop_recording
+2. 唤醒后收到音频 → 唤醒超时被取消
+3. 提示音安全超时 → 强制进入 WAITING_SPEECH
+4. 录音完成入队，worker 串行处理；积压超限丢弃最早的；唤醒词打断正在处理的录音
+5. 提示音 URL 按对象路径缓存，只读取一次配置
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.config import AudioConfig
+from app.models.protocol import ListeningState
+from app.api.websocket import (
+    AUDIO_QUEUE_SIZE,
+    _enqueue_audio,
+    handle_binary_message,
+    on_wake_word,
+    _start_listening_session_initial,
+    _continue_listening_session,
+    _get_prompt_sound_url,
+)
+
+
+# ── 1. 唤醒超时 ──────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_wake_timeout_resets_to_idle(conn, mock_manager):
+    """WOKEN 状态下超时 → IDLE + stop_recording"""
+    conn.audio_cfg = AudioConfig(wake_timeout=0.01)
+
+    await _start_listening_session_initial(conn)
+    assert conn.state == ListeningState.WOKEN
+    assert conn._timeout_handle is not None
+
+    await asyncio.sleep(0.05)
+
+    assert conn.state == ListeningState.IDLE
+    assert conn._timeout_handle is None
+    commands = [c.args[1].command for c in mock_manager.send_request.call_args_list]
+    assert commands[-1] == "stop_recording"
+
+
+# ── 2. 收到音频取消超时 ──────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_wake_timeout_cancelled_on_audio(conn, mock_manager):
+    """开始录音后超时不再触发"""
+    conn.audio_cfg = AudioConfig(wake_timeout=0.01)
+    conn.audio_buffer = conn.new_audio_buffer()
+
+    await _start_listening_session_initial(conn)
+    await handle_binary_message(conn, b"\x00\x00" * 160)
+    assert conn.state == ListeningState.LISTENING
+    assert conn._timeout_handle is None
+
+    await asyncio.sleep(0.05)
+    assert conn.state == ListeningState.LISTENING
+
+
+# ── 3. 提示音安全超时 ────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_prompting_safety_timeout(conn, mock_manager):
+    """PROMPTING 状态下 IDLE 事件未到 → 超时进入 WAITING_SPEECH"""
+    with patch("app.api.websocket._get_prompt_sound_url", return_value="http://x/ding.mp3"), \
+         patch("app.api.websocket._enter_waiting_speech", new_callable=AsyncMock) as enter:
+        loop = asyncio.get_running_loop()
+        with patch.object(loop, "call_later", wraps=loop.call_later) as call_later:
+            await _continue_listening_session(conn)
+            delay, callback, arg = call_later.call_args.args
+
+        assert conn.state == ListeningState.PROMPTING
+        conn._timeout_handle.cancel()
+        callback(arg)  # 直接触发回调，避免等待 3s
+        await asyncio.sleep(0)
+
+        enter.assert_awaited_once_with(conn)
+        assert delay == 3.0
+
+
+# ── 4. pipeline worker ───────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_audio_queue_serial_and_drop_oldest(conn):
+    """处理第一段期间再完成多段 → 串行处理，超出容量丢弃最早积压的"""
+    processed = []
+    release = asyncio.Event()
+
+    async def fake_complete(c, audio_data, has_speech):
+        processed.append((audio_data, has_speech))
+        if audio_data == b"a":
+            await release.wait()
+
+    assert AUDIO_QUEUE_SIZE == 2
+
+    with patch("app.api.websocket.on_audio_complete", side_effect=fake_complete):
+        _enqueue_audio(conn, b"a", True)
+        await asyncio.sleep(0)  # worker 取走 a 并阻塞
+
+        for data in (b"b", b"c", b"d"):  # 容量 2 → b 被丢弃
+            _enqueue_audio(conn, data, data != b"d")
+
+        release.set()
+        await asyncio.sleep(0.01)
+
+    # has_speech 随录音一起入队，原样交给 on_audio_complete
+    assert processed == [(b"a", True), (b"c", True), (b"d", False)]
+    conn._pipeline_worker.cancel()
+
+
+@pytest.mark.asyncio
+async def test_wake_word_cancels_inflight_recording(conn, mock_manager):
+    """旧录音仍在 respond 中时唤醒 → 旧 worker 被取消、积压清空，新录音立即处理"""
+    processed = []
+    cancelled = asyncio.Event()
+
+    async def fake_complete(c, audio_data, has_speech):
+        processed.append(audio_data)
+        if audio_data == b"old":
+            try:
+                await asyncio.sleep(15)  # 模拟 respond 等待播放结束
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+    with patch("app.api.websocket.on_audio_complete", side_effect=fake_complete):
+        _enqueue_audio(conn, b"old", True)
+        await asyncio.sleep(0)
+        _enqueue_audio(conn, b"stale", True)
+
+        await on_wake_word(conn, MagicMock(data="小爱同学"))
+
+        assert cancelled.is_set()
+        assert conn._pipeline_worker is None
+        assert conn._audio_queue.empty()
+        assert conn.state == ListeningState.WOKEN
+
+        _enqueue_audio(conn, b"new", True)
+        await asyncio.sleep(0.01)
+
+    assert processed == [b"old", b"new"]
+    conn.cancel_pending("_pipeline_worker", "_timeout_handle")
+
+
+# ── 5. 提示音 URL 缓存 ───────────────────────────────────
+
+
+def test_prompt_sound_url_cached():
+    """同一对象路径只拼接一次 URL；未配置 public_base_url 时缓存 None"""
+    settings = MagicMock()
+    settings.minio.public_base_url = "http://minio.local/voice/"
+
+    with patch.dict("app.api.websocket._prompt_url_cache", clear=True), \
+         patch("app.api.websocket.get_settings", return_value=settings) as get_settings:
+        assert _get_prompt_sound_url("system/ding.mp3") == "http://minio.local/voice/system/ding.mp3"
+        assert _get_prompt_sound_url("system/ding.mp3") == "http://minio.local/voice/system/ding.mp3"
+        assert get_settings.call_count == 1
+
+        settings.minio.public_base_url = ""
+        assert _get_prompt_sound_url("system/exit.mp3") is None
+        assert _get_prompt_sound_url("system/exit.mp3") is None
+        assert get_settings.call_count == 2
@@ -0,0 +1,141 @@
+"""
+NLU 意图识别测试
+
+覆盖场景:
+1. 固定指令精确匹配（含 ASR 尾部标点），不调用 LLM
+2. 精确匹配表与正则规则结论一致
+3. 非固定指令走正则规则
+4. 关键词预筛选与逐条正则匹配结果一致
+5. LLM 分类结果按文本缓存；调用失败（error/content_filter 兜底结果）或响应非 JSON 不缓存
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.llm import LLMResult
+from app.core.nlu import EXACT_COMMANDS, Intent, NLUService
+
+
+# ── Fixtures ─────────────────────────────────────────────
+
+
+def _llm_result(response: str, model_used: str = "test-model") -> LLMResult:
+    return LLMResult(
+        response=response,
+        model_used=model_used,
+        provider=model_used,
+        cached=False,
+        prompt_tokens=0,
+        completion_tokens=0,
+        total_tokens=0,
+        response_time_ms=0,
+    )
+
+
+@pytest.fixture
+def nlu():
+    llm = MagicMock()
+    llm.chat_with_details = AsyncMock()
+    return NLUService(llm_service=llm)
+
+
+# ── 1. 精确匹配 ──────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_exact_command_hit(nlu):
+    """"暂停。" → CONTROL_PAUSE，不走 LLM"""
+    result = await nlu.recognize("暂停。")
+
+    assert result.intent == Intent.CONTROL_PAUSE
+    assert result.raw_text == "暂停。"
+    nlu.llm_service.chat_with_details.assert_not_called()
+
+
+# ── 2. 与规则一致 ────────────────────────────────────────
+
+
+def test_exact_commands_agree_with_rules(nlu):
+    """精确匹配表中的每条短语，正则规则给出相同意图"""
+    for phrase, intent in EXACT_COMMANDS.items():
+        assert nlu._rule_match(phrase).intent == intent, phrase
+
+
+# ── 3. 规则匹配 ──────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_rule_match_fallback(nlu):
+    """分类故事不在精确表中 → 正则提取槽位"""
+    result = await nlu.recognize("讲睡前故事")
+
+    assert result.intent == Intent.PLAY_STORY_CATEGORY
+    assert result.slots == {"category": "睡前故事"}
+
+
+# ── 4. 关键词预筛选 ──────────────────────────────────────
+
+
+def test_keyword_prefilter_matches_full_scan(nlu):
+    """预筛选后的结果与逐条跑全部正则一致"""
+    def full_scan(text):
+        for pattern, intent, _, _ in nlu.rules:
+            if pattern.search(text):
+                return intent
+        return None
+
+    phrases = [
+        "讲睡前故事", "来点童话故事", "讲个故事", "播放儿歌", "来点古典音乐", "放首音乐", "来首歌",
+        "暂停", "停一下", "继续播放", "别放了", "下一首", "换一个", "上一首", "大点声", "调小",
+        "单曲循环", "随机播放", "学英语", "苹果用英语怎么说", "英文怎么说老虎", "跟我读apple",
+        "香蕉英文怎么读", "删掉小星星", "现在几点了", "什么时间", "今天星期几", "明天天气怎么样",
+        "外面冷吗", "要不要带伞", "你好呀", "为什么天是蓝色的", "",
+    ]
+    for phrase in phrases:
+        result = nlu._rule_match(phrase)
+        assert (result.intent if result else None) == full_scan(phrase), phrase
+
+    # 每条规则都能通过其关键词被选中
+    for pattern, _, _, keywords in nlu.rules:
+        assert keywords, pattern.pattern
+
+
+# ── 5. LLM 分类缓存 ──────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_llm_classify_cached(nlu):
+    """同一句话第二次识别命中缓存，不再调用 LLM；失败结果不缓存"""
+    nlu.llm_service.chat_with_details.return_value = _llm_result(
+        '{"intent":"play_music_by_artist","slots":{"artist_name":"周杰伦"}}'
+    )
+
+    first = await nlu.recognize("我想听周杰伦")
+    first.slots["artist_name"] = "changed"
+    second = await nlu.recognize("我想听周杰伦")
+
+    assert second.intent == Intent.PLAY_MUSIC_BY_ARTIST
+    assert second.slots == {"artist_name": "周杰伦"}
+    nlu.llm_service.chat_with_details.assert_awaited_once()
+
+    # LLMService 网络/HTTP 错误时不抛异常，而是返回 model_used="error" 的兜底话术
+    nlu.llm_service.chat_with_details.return_value = _llm_result(
+        "抱歉，我现在有点累了，稍后再聊好吗？", model_used="error"
+    )
+    result = await nlu.recognize("给我讲讲恐龙怎么灭绝的啊")
+    assert result.intent == Intent.CHAT
+    assert "给我讲讲恐龙怎么灭绝的啊" not in nlu._llm_cache
+
+    # 内容过滤兜底同样不缓存
+    nlu.llm_service.chat_with_details.return_value = _llm_result(
+        "我们聊点别的吧", model_used="content_filter"
+    )
+    await nlu.recognize("随便聊聊")
+    assert "随便聊聊" not in nlu._llm_cache
+
+    # 调用成功但响应非 JSON（纯文本回退）也不缓存
+    nlu.llm_service.chat_with_details.return_value = _llm_result("chat")
+    await nlu.recognize("今天心情不错")
+    assert "今天心情不错" not in nlu._llm_cache
+    assert list(nlu._llm_cache) == ["我想听周杰伦"]
+    assert nlu.llm_service.chat_with_details.await_count == 4
@@ -0,0 +1,228 @@
+"""
+VoicePipeline 测试
+
+覆盖场景:
+1. 相同文本重复合成只调用一次 TTS 服务
+2. 超出容量时淘汰最久未使用的条目
+3. 预热固定提示语时单条失败不影响其余
+4. 静音或过短录音跳过 ASR，直接返回"没听清"；最短时长按连接采样率换算
+5. 附加命令按顺序映射为设备请求，未知命令忽略
+6. TTS 合成与 pause 等待并行；respond 被取消时后台合成一并取消
+"""
+
+import asyncio
+import struct
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.config import AudioConfig
+from app.core.tts import TTSResult
+from app.models.protocol import Request
+
+
+# ── Fixtures ─────────────────────────────────────────────
+
+
+def _result(text: str) -> TTSResult:
+    return TTSResult(
+        audio_url=f"https://tts.example.com/{text}.mp3",
+        duration_ms=1000,
+        character_count=len(text),
+        is_cached=False,
+        voice_name="test",
+        language_code="zh-CN",
+    )
+
+
+@pytest.fixture
+def pipeline():
+    from app.core.pipeline import VoicePipeline
+
+    tts = MagicMock()
+    tts.synthesize = AsyncMock(side_effect=_result)
+    return VoicePipeline(
+        asr_service=MagicMock(),
+        nlu_service=MagicMock(),
+        tts_service=tts,
+        handler_router=MagicMock(),
+    )
+
+
+# ── 1. 缓存命中 ──────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_synthesize_cache_hit(pipeline):
+    """相同文本第二次合成直接命中缓存"""
+    first = await pipeline.synthesize("你好")
+    second = await pipeline.synthesize("你好")
+
+    assert first is second
+    pipeline.tts.synthesize.assert_called_once_with("你好")
+
+
+# ── 2. LRU 淘汰 ──────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_synthesize_lru_eviction(pipeline):
+    """超出容量 → 淘汰最久未使用的文本"""
+    with patch("app.core.pipeline.TTS_CACHE_SIZE", 2):
+        await pipeline.synthesize("a")
+        await pipeline.synthesize("b")
+        await pipeline.synthesize("a")  # a 变为最近使用
+        await pipeline.synthesize("c")  # 淘汰 b
+
+    assert list(pipeline._tts_cache) == ["a", "c"]
+
+
+# ── 3. 预热 ──────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_warm_up_tts_tolerates_failure(pipeline):
+    """某条提示语合成失败 → 记录警告，其余照常缓存"""
+    from app.core.pipeline import MSG_ERROR, MSG_NOT_HEARD, MSG_NOT_HEARD_IN_SESSION
+
+    def _side_effect(text):
+        if text == MSG_ERROR:
+            raise RuntimeError("boom")
+        return _result(text)
+
+    pipeline.tts.synthesize = AsyncMock(side_effect=_side_effect)
+
+    with patch("app.core.pipeline.logger"):
+        await pipeline.warm_up_tts()
+
+    assert MSG_NOT_HEARD in pipeline._tts_cache
+    assert MSG_NOT_HEARD_IN_SESSION in pipeline._tts_cache
+    assert MSG_ERROR not in pipeline._tts_cache
+
+
+# ── 4. 静音跳过 ASR ──────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_process_audio_skips_asr_on_silence(pipeline):
+    """语音帧不足或录音过短 → 不调用 ASR"""
+    from app.core.pipeline import MSG_NOT_HEARD
+
+    pipeline.asr.transcribe = AsyncMock(return_value="你好")
+    conn = MagicMock(_in_conversation_session=False, audio_cfg=AudioConfig())
+    silence = struct.pack("<2h", 20, -20) * 4000
+    short_speech = struct.pack("<2h", 3000, -3000) * 10
+
+    with patch("app.core.pipeline.logger"):
+        response = await pipeline.process_audio(silence, "test-dev", conn, False)
+        short_response = await pipeline.process_audio(short_speech, "test-dev", conn, True)
+
+    pipeline.asr.transcribe.assert_not_called()
+    assert response.text == MSG_NOT_HEARD
+    assert short_response.text == MSG_NOT_HEARD
+
+
+@pytest.mark.asyncio
+async def test_process_audio_calls_asr_on_speech(pipeline):
+    """有能量的录音照常走 ASR"""
+    pipeline.asr.transcribe = AsyncMock(return_value="")
+    conn = MagicMock(_in_conversation_session=True, audio_cfg=AudioConfig())
+    speech = struct.pack("<2h", 3000, -3000) * 4000
+
+    with patch("app.core.pipeline.logger"):
+        response = await pipeline.process_audio(speech, "test-dev", conn, True)
+
+    pipeline.asr.transcribe.assert_awaited_once_with(speech)
+    assert response.continue_listening
+
+
+@pytest.mark.asyncio
+async def test_process_audio_min_length_follows_sample_rate(pipeline):
+    """最短录音按连接采样率换算：8kHz 下 0.25s（4000 字节）照常走 ASR"""
+    pipeline.asr.transcribe = AsyncMock(return_value="")
+    conn = MagicMock(_in_conversation_session=False, audio_cfg=AudioConfig(sample_rate=8000))
+    speech = struct.pack("<2h", 3000, -3000) * 1000
+
+    with patch("app.core.pipeline.logger"):
+        await pipeline.process_audio(speech, "test-dev", conn, True)
+
+    pipeline.asr.transcribe.assert_awaited_once_with(speech)
+
+
+# ── 5. 附加命令 ──────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_respond_dispatches_commands_in_order(pipeline):
+    """["volume_up", "bogus", "play"] → 依次发送 volume_up、play"""
+    from app.handlers.base import HandlerResponse
+
+    conn = MagicMock(device_id="test-dev")
+    response = HandlerResponse(text="", skip_interrupt=True, commands=["volume_up", "bogus", "play"])
+
+    with patch("app.api.websocket.manager") as manager, patch("app.core.pipeline.logger"):
+        manager.send_request = AsyncMock()
+        await pipeline.respond(conn, response)
+
+    payloads = [c.args[1].payload for c in manager.send_request.call_args_list]
+    assert payloads == [Request.volume_up().payload, Request.play().payload]
+
+
+# ── 6. TTS 与 pause 并行 ─────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_respond_overlaps_tts_with_pause(pipeline):
+    """pause 等待期间 TTS 已在合成，合成完成后才播放 TTS"""
+    from app.handlers.base import HandlerResponse
+
+    events = []
+
+    async def slow_tts(text):
+        events.append("tts_start")
+        await asyncio.sleep(0.05)
+        events.append("tts_done")
+        return _result(text)
+
+    async def send_request(device_id, request):
+        events.append(request.payload)
+
+    pipeline.tts.synthesize = AsyncMock(side_effect=slow_tts)
+    conn = MagicMock(device_id="test-dev")
+
+    with patch("app.api.websocket.manager") as manager, patch("app.core.pipeline.logger"):
+        manager.send_request = AsyncMock(side_effect=send_request)
+        await pipeline.respond(conn, HandlerResponse(text="好的"))
+
+    assert events.index("tts_start") < events.index("tts_done")
+    assert events.index(Request.pause().payload) < events.index("tts_done")
+    assert events[-1] == Request.play_url(_result("好的").audio_url).payload
+
+
+@pytest.mark.asyncio
+async def test_respond_cancelled_cancels_tts(pipeline):
+    """respond 在 pause 等待中被取消（唤醒词打断）→ 后台 TTS 合成同样被取消"""
+    from app.handlers.base import HandlerResponse
+
+    tts_cancelled = asyncio.Event()
+
+    async def hanging_tts(text):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            tts_cancelled.set()
+            raise
+
+    pipeline.tts.synthesize = AsyncMock(side_effect=hanging_tts)
+    conn = MagicMock(device_id="test-dev")
+
+    with patch("app.api.websocket.manager") as manager, patch("app.core.pipeline.logger"):
+        manager.send_request = AsyncMock()
+        task = asyncio.create_task(pipeline.respond(conn, HandlerResponse(text="好的")))
+        await asyncio.sleep(0.05)  # 进入 pause 后的等待
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+
+    assert tts_cancelled.is_set()
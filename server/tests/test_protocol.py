@@ -0,0 +1,113 @@
+"""
+open-xiaoai 协议编解码测试
+
+覆盖场景:
+1. 固定命令走预序列化片段，输出与通用序列化一致
+2. 动态 payload (含中文/dict) 正常序列化
+3. 包装格式 Event/Response 解析，非法 JSON 返回 None
+4. 请求 ID 自增且唯一
+5. 二进制帧：Stream 包装还原 PCM，非 '{' 开头的 raw PCM 不做 JSON 解析
+6. instruction 事件的 NewLine 内层 JSON 只解析一次
+"""
+
+from unittest.mock import patch
+
+import orjson
+
+from app.models.protocol import (
+    Event, Request, Response, parse_binary_message, parse_json_message,
+)
+
+
+# ── 1. 预序列化 ──────────────────────────────────────────
+
+
+def test_preserialized_matches_generic():
+    """pause/abort_xiaoai 等固定命令的输出与逐字段序列化结果一致"""
+    for req in (Request.pause(), Request.abort_xiaoai(), Request.stop_recording(),
+                Request.wake_up(silent=True), Request.volume_up()):
+        assert orjson.loads(req.to_json()) == {"Request": req.to_dict()}
+
+
+# ── 2. 动态 payload ──────────────────────────────────────
+
+
+def test_dynamic_payload():
+    """中文文本与 dict payload"""
+    req = Request.play_text("你好")
+    assert orjson.loads(req.to_json())["Request"]["payload"] == "/usr/sbin/tts_play.sh '你好'"
+    assert "你好" in req.to_json()
+
+    req = Request.start_recording()
+    assert orjson.loads(req.to_json())["Request"]["payload"]["sample_rate"] == 16000
+
+
+# ── 3. 解析 ──────────────────────────────────────────────
+
+
+def test_parse_json_message():
+    event = parse_json_message('{"Event": {"id": "e1", "event": "kws", "data": "小爱同学"}}')
+    assert isinstance(event, Event) and event.is_wake_word()
+
+    response = parse_json_message('{"Response": {"id": "r1", "code": 0}}')
+    assert isinstance(response, Response) and response.is_success()
+
+    assert parse_json_message("not json") is None
+
+
+# ── 4. 请求 ID ───────────────────────────────────────────
+
+
+def test_request_ids_unique():
+    """同一进程内请求 ID 不重复，且共享进程前缀"""
+    ids = [Request.pause().id for _ in range(100)]
+
+    assert len(set(ids)) == 100
+    assert len({i.split("-")[0] for i in ids}) == 1
+
+
+# ── 5. 二进制帧 ──────────────────────────────────────────
+
+
+def test_parse_binary_stream():
+    """Stream 包装的 bytes 数组还原为 PCM"""
+    frame = orjson.dumps({"id": "s1", "tag": "record", "bytes": [1, 2, 3, 4], "data": None})
+    stream = parse_binary_message(frame)
+
+    assert stream is not None and stream.is_audio_stream()
+    assert stream.data == b"\x01\x02\x03\x04"
+
+
+def test_parse_binary_raw_pcm_skips_json():
+    """raw PCM（首字节不是 '{'）→ 直接返回 None，不调用 orjson.loads"""
+    with patch("app.models.protocol.orjson.loads") as loads:
+        assert parse_binary_message(b"\x00\x01" * 160) is None
+    loads.assert_not_called()
+
+
+# ── 6. instruction 解析缓存 ──────────────────────────────
+
+
+def test_instruction_new_line_parsed_once():
+    """文本/final/云端命令判定共用一次内层 JSON 解析"""
+    inner = orjson.dumps({
+        "header": {"namespace": "SpeechRecognizer", "name": "RecognizeResult"},
+        "payload": {"is_final": True, "results": [{"text": "暂停"}]},
+    }).decode()
+    event = Event(id="e1", event="instruction", data={"NewLine": inner})
+
+    with patch("app.models.protocol.orjson.loads", wraps=orjson.loads) as loads:
+        assert event.get_instruction_text() == "暂停"
+        assert event.is_instruction_final() is True
+        assert event.is_cloud_playback_command() is False
+    assert loads.call_count == 1
+
+
+def test_cloud_playback_command():
+    """AudioPlayer/Play 识别为云端播放；非法 NewLine 不报错"""
+    play = orjson.dumps({"header": {"namespace": "AudioPlayer", "name": "Play"}}).decode()
+
+    assert Event(id="e1", event="instruction", data={"NewLine": play}).is_cloud_playback_command()
+    bad = Event(id="e2", event="instruction", data={"NewLine": "not json"})
+    assert not bad.is_cloud_playback_command()
+    assert bad.get_instruction_text() is None
@@ -112,16 +112,14 @@ async def test_db_miss_triggers_generation(handler, mock_content_service, contex
         "play_url": "https://minio/music/bgm.mp3"
     }
 
-    with patch("app.handlers.story.httpx.AsyncClient") as mock_httpx:
-        # Mock httpx download for _persist_audio
+    with patch("app.handlers.story.get_http_client") as mock_httpx:
+        # Mock 共享 HTTP 客户端下载 (_persist_audio)
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         mock_resp.content = b"fake-audio-bytes"
         mock_resp.raise_for_status = MagicMock()
         mock_client = AsyncMock()
         mock_client.get = AsyncMock(return_value=mock_resp)
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=False)
         mock_httpx.return_value = mock_client
 
         result = await handler.handle(
@@ -154,14 +152,12 @@ async def test_generation_without_context(handler, mock_content_service):
     """无 context 时跳过播报和背景音乐，LLM 仍能生成"""
     mock_content_service.get_content_by_name.return_value = None
 
-    with patch("app.handlers.story.httpx.AsyncClient") as mock_httpx:
+    with patch("app.handlers.story.get_http_client") as mock_httpx:
         mock_resp = MagicMock()
         mock_resp.content = b"audio"
         mock_resp.raise_for_status = MagicMock()
         mock_client = AsyncMock()
         mock_client.get = AsyncMock(return_value=mock_resp)
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=False)
         mock_httpx.return_value = mock_client
 
         result = await handler.handle(
@@ -221,14 +217,12 @@ async def test_long_name_truncated(handler, mock_content_service):
     long_name = "很" * 100  # 100 chars
     assert len(long_name) > _MAX_STORY_NAME_LENGTH
 
-    with patch("app.handlers.story.httpx.AsyncClient") as mock_httpx:
+    with patch("app.handlers.story.get_http_client") as mock_httpx:
         mock_resp = MagicMock()
         mock_resp.content = b"audio"
         mock_resp.raise_for_status = MagicMock()
         mock_client = AsyncMock()
         mock_client.get = AsyncMock(return_value=mock_resp)
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=False)
         mock_httpx.return_value = mock_client
 
         result = await handler.handle(
@@ -284,14 +278,12 @@ async def test_unsafe_llm_output_filtered(handler, mock_content_service):
 @pytest.mark.asyncio
 async def test_persist_audio_success(handler):
     """_persist_audio 成功时返回 MinIO 对象路径"""
-    with patch("app.handlers.story.httpx.AsyncClient") as mock_httpx:
+    with patch("app.handlers.story.get_http_client") as mock_httpx:
         mock_resp = MagicMock()
         mock_resp.content = b"fake-mp3-bytes"
         mock_resp.raise_for_status = MagicMock()
         mock_client = AsyncMock()
         mock_client.get = AsyncMock(return_value=mock_resp)
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=False)
         mock_httpx.return_value = mock_client
 
         result = await handler._persist_audio("小星星", "https://tts.example.com/audio.mp3")
@@ -308,11 +300,9 @@ async def test_persist_audio_success(handler):
 @pytest.mark.asyncio
 async def test_persist_audio_fallback_on_failure(handler):
     """_persist_audio 失败时返回原始 URL（降级）"""
-    with patch("app.handlers.story.httpx.AsyncClient") as mock_httpx:
+    with patch("app.handlers.story.get_http_client") as mock_httpx:
         mock_client = AsyncMock()
         mock_client.get = AsyncMock(side_effect=Exception("network error"))
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=False)
         mock_httpx.return_value = mock_client
 
         result = await handler._persist_audio("test", "https://tts.example.com/x.mp3")
@@ -379,14 +369,12 @@ async def test_second_request_hits_db(handler, mock_content_service):
     # 第一次：DB 未命中
     mock_content_service.get_content_by_name.return_value = None
 
-    with patch("app.handlers.story.httpx.AsyncClient") as mock_httpx:
+    with patch("app.handlers.story.get_http_client") as mock_httpx:
         mock_resp = MagicMock()
         mock_resp.content = b"audio"
         mock_resp.raise_for_status = MagicMock()
         mock_client = AsyncMock()
         mock_client.get = AsyncMock(return_value=mock_resp)
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=False)
         mock_httpx.return_value = mock_client
 
         r1 = await handler.handle(
@@ -453,14 +441,12 @@ async def test_db_save_failure_still_plays(handler, mock_content_service):
         side_effect=Exception("DB connection lost")
     )
 
-    with patch("app.handlers.story.httpx.AsyncClient") as mock_httpx:
+    with patch("app.handlers.story.get_http_client") as mock_httpx:
         mock_resp = MagicMock()
         mock_resp.content = b"audio"
         mock_resp.raise_for_status = MagicMock()
         mock_client = AsyncMock()
         mock_client.get = AsyncMock(return_value=mock_resp)
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=False)
         mock_httpx.return_value = mock_client
 
         # 需要给 _get_ai_category_id 设置缓存避免 session_factory 调用
@@ -487,14 +473,12 @@ async def test_bgm_failure_still_generates(handler, mock_content_service, contex
         side_effect=Exception("music DB error")
     )
 
-    with patch("app.handlers.story.httpx.AsyncClient") as mock_httpx:
+    with patch("app.handlers.story.get_http_client") as mock_httpx:
         mock_resp = MagicMock()
         mock_resp.content = b"audio"
         mock_resp.raise_for_status = MagicMock()
         mock_client = AsyncMock()
         mock_client.get = AsyncMock(return_value=mock_resp)
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=False)
         mock_httpx.return_value = mock_client
 
         result = await handler.handle(